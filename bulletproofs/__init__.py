@@ -0,0 +1,7 @@
+"""
+Shared building blocks for the chapter scripts.
+
+The chapter files are written as standalone exercises; the code that several
+of them need (multi-scalar multiplication, curve arithmetic, ...) lives here
+so it can be imported from any chapter, e.g. `from bulletproofs.msm import msm`.
+"""
@@ -0,0 +1,177 @@
+"""
+Aggregated proofs for m committed inner products with one log-size argument.
+
+Chapter 5 proves one committed value v = <a, b> at a time, with
+V = v g + gamma B. Here m statements V_k = <a_k, b_k> g + gamma_k B, each with
+vectors of length n, are proven together:
+
+1.  The prover concatenates a = a_1 || ... || a_m and b = b_1 || ... || b_m
+    and commits, as in chapter 5,
+        A = <a, G> + <b, H> + alpha B        S = <sL, G> + <sR, H> + beta B
+    over generator vectors G, H of length m n.
+2.  The challenge z weights block k by z^k. With zv = (z^k repeated n times for
+    every block k), the prover uses
+        l(x) = a + sL x        r(x) = zv o (b + sR x)
+    so that t(x) = <l(x), r(x)> = sum_k z^k v_k + t1 x + t2 x^2, and sends
+    T1 = t1 g + tau1 B and T2 = t2 g + tau2 B.
+3.  For the challenge x, the prover reveals t_hat = <l, r>,
+    tau_x = sum_k z^k gamma_k + tau1 x + tau2 x^2 and mu = alpha + beta x.
+    Because <b + sR x, H> = <r, H'> with H'_i = z^-k H_i,
+        A + x S - mu B == <l, G> + <r, H'>
+    and instead of sending l and r, the prover runs the two-vector inner product
+    argument (ipa.prove_inner_product) on P = A + x S - mu B + t_hat w Q, where
+    w is one more challenge.
+
+The proof is 4 + 2 ceil(log2(m n)) points and 5 scalars, whatever m is. All
+challenges come from a Fiat-Shamir transcript, and the verifier checks
+    t_hat g + tau_x B == sum_k z^k V_k + x T1 + x^2 T2
+together with the inner product argument as one multi-scalar multiplication.
+"""
+from bulletproofs.curve import curve_order as p
+from bulletproofs.curve import multiply, is_inf
+from bulletproofs.msm import msm
+from bulletproofs import ipa, scalars, serialize
+from bulletproofs.batch import random_weight
+import secrets
+
+def random_scalar():
+    return secrets.randbelow(p)
+
+def commit_value(a, b, gamma, g, B):
+    """
+    Commit to v = <a, b> as V = v g + gamma B.
+    """
+    return msm([g, B], [scalars.inner_product(a, b), gamma])
+
+def _block_powers(z, m, n):
+    # [1] * n + [z] * n + [z^2] * n + ...
+    powers = []
+    zk = 1
+    for _ in range(m):
+        powers += [zk] * n
+        zk = zk * z % p
+    return powers
+
+def prove(a_vecs, b_vecs, gammas, Vs, G_vec, H_vec, g, B, Q, transcript):
+    """
+    Prove that every V_k commits to <a_k, b_k>.
+
+    Parameters:
+    - a_vecs, b_vecs: lists of m scalar vectors, each of length n
+    - gammas: the m blinding terms of the V_k
+    - Vs: the m commitments V_k = <a_k, b_k> g + gamma_k B
+    - G_vec, H_vec: generator vectors of length m n
+    - g, B, Q: value, blinding and inner product generators
+    - transcript: a bulletproofs.transcript.Transcript
+
+    Returns:
+    - proof: (A, S, T1, T2, t_hat, tau_x, mu, Ls, Rs, a_final, b_final)
+    """
+    m = len(a_vecs)
+    n = len(a_vecs[0])
+    assert all(len(v) == n for v in a_vecs + b_vecs), "All vectors must have the same length"
+    assert len(G_vec) == len(H_vec) == m * n, "Need m n generators in G_vec and H_vec"
+    a = [x % p for v in a_vecs for x in v]
+    b = [x % p for v in b_vecs for x in v]
+
+    sL = [random_scalar() for _ in range(m * n)]
+    sR = [random_scalar() for _ in range(m * n)]
+    alpha, beta, tau1, tau2 = (random_scalar() for _ in range(4))
+    A = msm(G_vec + H_vec + [B], a + b + [alpha])
+    S = msm(G_vec + H_vec + [B], sL + sR + [beta])
+
+    transcript.append_points(b"V", Vs)
+    transcript.append_points(b"A, S", [A, S])
+    z = transcript.challenge_scalar(b"z")
+    zv = _block_powers(z, m, n)
+
+    zb = scalars.hadamard(zv, b)
+    zsR = scalars.hadamard(zv, sR)
+    t1 = (scalars.inner_product(a, zsR) + scalars.inner_product(sL, zb)) % p
+    t2 = scalars.inner_product(sL, zsR)
+    T1 = msm([g, B], [t1, tau1])
+    T2 = msm([g, B], [t2, tau2])
+
+    transcript.append_points(b"T1, T2", [T1, T2])
+    x = transcript.challenge_scalar(b"x")
+
+    l = scalars.evaluate([a, sL], x)
+    r = scalars.evaluate([zb, zsR], x)
+    t_hat = scalars.inner_product(l, r)
+    tau_x = (sum(zk * gamma for zk, gamma in zip(zv[::n], gammas)) + tau1 * x + tau2 * x * x) % p
+    mu = (alpha + beta * x) % p
+
+    transcript.append_message(b"t_hat, tau_x, mu", serialize.encode_scalars([t_hat, tau_x, mu]))
+    w = transcript.challenge_scalar(b"w")
+
+    # The argument runs on H'_i = z^-k H_i; the points are needed by the prover only
+    z_inv = scalars.inverse(z)
+    H_prime = [multiply(H_i, c) for H_i, c in zip(H_vec, _block_powers(z_inv, m, n))]
+    Qw = multiply(Q, w)
+    Ls, Rs, _, a_final, b_final = ipa.prove_inner_product(
+        G_vec, H_prime, Qw, l, r, ipa.transcript_challenges(transcript))
+    return (A, S, T1, T2, t_hat, tau_x, mu, Ls, Rs, a_final, b_final)
+
+def verify(Vs, proof, G_vec, H_vec, g, B, Q, transcript):
+    """
+    Verify an aggregated proof with one multi-scalar multiplication.
+
+    Parameters:
+    - Vs: the m commitments V_k
+    - proof: as returned by prove
+    - G_vec, H_vec, g, B, Q: the generators used by the prover
+    - transcript: a fresh transcript with the same label as the prover's
+
+    Returns:
+    - True if every V_k commits to the inner product of its vectors
+    """
+    A, S, T1, T2, t_hat, tau_x, mu, Ls, Rs, a_final, b_final = proof
+    m = len(Vs)
+    if m == 0 or len(G_vec) != len(H_vec) or len(G_vec) % m or len(Ls) != len(Rs):
+        return False
+    n = len(G_vec) // m
+    if ipa.num_rounds(len(G_vec)) != len(Ls):
+        return False
+
+    transcript.append_points(b"V", Vs)
+    transcript.append_points(b"A, S", [A, S])
+    z = transcript.challenge_scalar(b"z")
+    transcript.append_points(b"T1, T2", [T1, T2])
+    x = transcript.challenge_scalar(b"x")
+    transcript.append_message(b"t_hat, tau_x, mu", serialize.encode_scalars([t_hat, tau_x, mu]))
+    w = transcript.challenge_scalar(b"w")
+    challenge = ipa.transcript_challenges(transcript)
+    us = [challenge(L, R) for L, R in zip(Ls, Rs)]
+
+    # Inner product argument on P = A + x S - mu B + t_hat w Q, against H'_i = z^-k H_i
+    z_inv = scalars.inverse(z)
+    points, scalars_ = ipa.inner_product_terms(
+        G_vec, H_vec, Q, Ls, Rs, us, a_final, b_final, H_scale=_block_powers(z_inv, m, n))
+    # The Q term of the argument is for Qw = w Q
+    scalars_[2 * len(G_vec)] = scalars_[2 * len(G_vec)] * w % p
+    points += [A, S, B, Q]
+    scalars_ += [-1, -x, mu, -t_hat * w]
+
+    # t_hat g + tau_x B - sum_k z^k V_k - x T1 - x^2 T2 == 0, weighted by a random c
+    c = random_weight()
+    zk = [pow(z, k, p) for k in range(m)]
+    points += [g, B] + list(Vs) + [T1, T2]
+    scalars_ += [c * t_hat, c * tau_x] + [-c * zk_ for zk_ in zk] + [-c * x, -c * x * x]
+    return is_inf(msm(points, scalars_))
+
+def encode(proof):
+    """
+    Serialize an aggregated proof with serialize.encode_proof.
+    """
+    A, S, T1, T2, t_hat, tau_x, mu, Ls, Rs, a_final, b_final = proof
+    return serialize.encode_proof([A, S, T1, T2] + Ls + Rs, [t_hat, tau_x, mu, a_final, b_final])
+
+def decode(data):
+    points, scalars_ = serialize.decode_proof(data)
+    if len(points) < 4 or len(points) % 2 or len(scalars_) != 5:
+        raise ValueError("Not an aggregated proof")
+    A, S, T1, T2 = points[:4]
+    rounds = (len(points) - 4) // 2
+    Ls, Rs = points[4:4 + rounds], points[4 + rounds:]
+    t_hat, tau_x, mu, a_final, b_final = scalars_
+    return (A, S, T1, T2, t_hat, tau_x, mu, Ls, Rs, a_final, b_final)
@@ -0,0 +1,93 @@
+"""
+Batch verification of many proofs with a random linear combination.
+
+Every point check of the chapter 3 - 5 protocols can be written as an
+equation sum_k (c_k * P_k) == 0. To verify a batch, each equation is
+multiplied by a fresh random weight and all of them are added together, so
+the whole batch is one multi-scalar multiplication. Terms on the same base
+(G, H, B, ...) are merged first, so shared generators are only paid for once.
+
+If the combined check fails, the batch is split in half and each half is
+checked again, until the invalid proofs are isolated.
+
+An equation is a list of (point, scalar) pairs. A proof is a list of
+equations, or None for a proof already known to be invalid (e.g. because
+one of its scalar-only checks failed).
+"""
+from bulletproofs.curve import curve_order as p
+from bulletproofs.curve import to_raw, raw_is_inf, raw_normalize_batch
+from bulletproofs.msm import raw_msm
+import secrets
+
+def random_weight():
+    # Weights must be unpredictable to the prover, so use a CSPRNG
+    return secrets.randbelow(p - 1) + 1
+
+def evaluation_proof(C0, C1, C2, G, B, u, f_u, pi):
+    """
+    Equations for the chapter 3 check C0 + C1 u + C2 u^2 == f_u G + pi B.
+    """
+    return [[(C0, 1), (C1, u), (C2, u * u), (G, -f_u), (B, -pi)]]
+
+def inner_product_proof(A, S, V, T1, T2, G, H, B, u, l_u, r_u, t_u, pi_lr, pi_t):
+    """
+    Equations for the chapter 4 / chapter 5 checks:
+        t_u == <l_u, r_u>
+        A + S u == <l_u, G> + <r_u, H> + pi_lr B
+        t_u G_0 + pi_t B == V + T1 u + T2 u^2
+
+    For chapter 4, pass G, H, l_u and r_u as one-element lists.
+
+    Returns:
+    - the list of point equations, or None if the scalar check fails
+    """
+    if t_u % p != sum(l * r for l, r in zip(l_u, r_u)) % p:
+        return None
+    eq_lr = [(A, 1), (S, u), (B, -pi_lr)]
+    eq_lr += [(G_i, -l) for G_i, l in zip(G, l_u)]
+    eq_lr += [(H_i, -r) for H_i, r in zip(H, r_u)]
+    eq_t = [(G[0], t_u), (B, pi_t), (V, -1), (T1, -u), (T2, -u * u)]
+    return [eq_lr, eq_t]
+
+def combined_check(proofs):
+    """
+    Check all equations of all proofs as one weighted multi-scalar multiplication.
+    """
+    if any(proof is None for proof in proofs):
+        return False
+    points, scalars = [], []
+    for proof in proofs:
+        for equation in proof:
+            r = random_weight()
+            for point, scalar in equation:
+                points.append(to_raw(point))
+                scalars.append(r * scalar)
+    # Normalize all points with one inversion, so that equal points merge into
+    # a single term whatever their Jacobian representation was
+    terms = {}
+    for point, scalar in zip(raw_normalize_batch(points), scalars):
+        terms[point] = (terms.get(point, 0) + scalar) % p
+    return raw_is_inf(raw_msm(list(terms), list(terms.values())))
+
+def batch_verify(proofs):
+    """
+    Verify many proofs at once.
+
+    Parameters:
+    - proofs: list of proofs, each a list of equations (see evaluation_proof
+      and inner_product_proof) or None
+
+    Returns:
+    - list of indices of the invalid proofs; empty if every proof is valid
+    """
+    def bisect(indices):
+        if combined_check([proofs[i] for i in indices]):
+            return []
+        if len(indices) == 1:
+            return indices
+        mid = len(indices) // 2
+        return bisect(indices[:mid]) + bisect(indices[mid:])
+
+    if not proofs:
+        return []
+    return bisect(list(range(len(proofs))))
@@ -0,0 +1,253 @@
+"""
+Benchmarks for commit, prove and verify of the chapter 7 folding argument.
+
+Run from the repository root, e.g.
+
+    python -m bulletproofs.bench --min-log 1 --max-log 10
+    python -m bulletproofs.bench --max-log 6 --backend affine-naive --backend projective-msm --json results.json
+
+For every n = 2^k and every selected backend, a random instance is generated
+and the following are timed separately:
+
+    commit     P = <a, G>
+    prove      the whole prover, and the wall time of every folding round
+    verify     the round-by-round verifier, and the single-MSM verifier where available
+    ip-prove   the prover of the two-vector argument (projective backends)
+
+The projective backends time the library code itself: ipa.prove (and
+ipa.prove_inner_product) run under an instrument.Profiler that only records
+the time of each "round" phase, and the verifiers are ipa.verify_folding and
+ipa.verify. Any change to the real prover path shows up here.
+
+Each phase is reported as seconds and operations per second. Peak memory of
+a full commit + prove + verify run is measured with tracemalloc in a separate
+pass, so tracing does not distort the timings (work done in worker processes
+is not traced). --json writes all results in a machine-readable form ("-"
+for stdout).
+
+Backends:
+
+    affine-naive         py_ecc.bn128 affine arithmetic, one multiply per term,
+                         with the folding loop written out here (the baseline)
+    projective-msm       ipa.prove, ipa.verify_folding and ipa.verify
+    projective-parallel  the same, with ipa.prove spreading each round over a
+                         process pool (bulletproofs.parallel)
+"""
+from bulletproofs import curve, msm, scalars, ipa, instrument
+from bulletproofs.curve import curve_order as p
+from functools import reduce
+import py_ecc.bn128 as affine
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+class Backend:
+    """
+    How a benchmark run commits, proves and verifies.
+
+    Parameters:
+    - name: backend name
+    - vector_commit: function (points, scalars) -> commitment
+    - library: True to run the bulletproofs.ipa prover and verifiers; False
+      for the local folding loop on py_ecc affine points
+    - parallel: True to give ipa.prove a process pool
+    """
+    def __init__(self, name, vector_commit, library=True, parallel=False):
+        self.name = name
+        self.vector_commit = vector_commit
+        self.library = library
+        self.parallel = parallel
+
+def _affine_commit(points, scalars):
+    return reduce(affine.add, [affine.multiply(P, s % p) for P, s in zip(points, scalars)], affine.Z1)
+
+def _affine_fold_points(point_vec, u, u_inv):
+    return [affine.add(affine.multiply(P1, u), affine.multiply(P2, u_inv))
+            for P1, P2 in zip(point_vec[0::2], point_vec[1::2])]
+
+BACKENDS = {
+    "affine-naive": Backend("affine-naive", _affine_commit, library=False),
+    "projective-msm": Backend("projective-msm", msm.msm),
+    "projective-parallel": Backend("projective-parallel", msm.msm, parallel=True),
+}
+
+def random_instance(n, rng):
+    """
+    Generate n random affine generators and a random scalar vector.
+
+    The generators are consecutive multiples of a random point (cheap to
+    produce for large n). Their discrete logs are known, which is fine for
+    timing but never for real commitments.
+    """
+    step = curve.to_raw(curve.multiply(curve.G1, rng.randrange(1, p)))
+    raw = [step]
+    for _ in range(n - 1):
+        raw.append(curve.raw_add(raw[-1], step))
+    G_vec = curve.normalize_batch([curve.from_raw(P) for P in raw])
+    a = [rng.randrange(p) for _ in range(n)]
+    return G_vec, a
+
+def _timed(f, *args):
+    start = time.perf_counter()
+    result = f(*args)
+    return result, time.perf_counter() - start
+
+def _phase(seconds):
+    return {"seconds": seconds, "ops_per_sec": (1 / seconds) if seconds > 0 else None}
+
+def _affine_prove(G_vec, a, rng):
+    # The chapter 7 prover on py_ecc affine points, timing each round
+    Ls, Rs, us, times = [], [], [], []
+    G_cur, a_cur = G_vec, a
+    while len(a_cur) > 1:
+        start = time.perf_counter()
+        L = _affine_commit(G_cur[1::2], a_cur[0::2])
+        R = _affine_commit(G_cur[0::2], a_cur[1::2])
+        u = rng.randrange(1, p)
+        u_inv = pow(u, -1, p)
+        a_cur = scalars.fold(a_cur, u, u_inv)
+        G_cur = _affine_fold_points(G_cur, u_inv, u)
+        times.append(time.perf_counter() - start)
+        Ls.append(L)
+        Rs.append(R)
+        us.append(u)
+    return (Ls, Rs, us, a_cur[0]), times
+
+def _affine_verify_folding(G_vec, P, Ls, Rs, us, a_final):
+    G = G_vec
+    for u in us:
+        u_inv = pow(u, -1, p)
+        G = _affine_fold_points(G, u_inv, u)
+    right = reduce(affine.add, [affine.multiply(L, u * u % p) for L, u in zip(Ls, us)]
+                   + [P] + [affine.multiply(R, pow(u, -2, p)) for R, u in zip(Rs, us)], affine.Z1)
+    return affine.eq(affine.multiply(G[0], a_final), right)
+
+def _round_times(profiler):
+    # Wall time of the "round k" phases of a phase-only Profiler, in order
+    phases = profiler.report()["phases"]
+    times = []
+    while "main/round %d" % (len(times) + 1) in phases:
+        times.append(phases["main/round %d" % (len(times) + 1)]["wall_time"])
+    return times
+
+def _library_prove(G_vec, a, rng, executor):
+    with instrument.Profiler(count=False) as profiler:
+        proof = ipa.prove(G_vec, a, lambda L, R: rng.randrange(1, p), executor)
+    return proof, _round_times(profiler)
+
+def run_protocol(backend, G_vec, a, rng, record=None, executor=None):
+    """
+    Commit, prove and verify once, optionally recording the time of each phase.
+
+    Parameters:
+    - executor: process pool for backends with parallel=True
+    """
+    P, t = _timed(backend.vector_commit, G_vec, a)
+    if record is not None:
+        record["commit"] = _phase(t)
+
+    if backend.library:
+        (proof, times), t = _timed(_library_prove, G_vec, a, rng, executor if backend.parallel else None)
+    else:
+        (proof, times), t = _timed(_affine_prove, G_vec, a, rng)
+    Ls, Rs, us, a_final = proof
+    if record is not None:
+        record["rounds"] = [{"n": m, "round": _phase(t_round)}
+                            for m, t_round in zip(ipa.round_lengths(len(a)), times)]
+        record["prove"] = _phase(t)
+
+    verify_folding = ipa.verify_folding if backend.library else _affine_verify_folding
+    ok, t = _timed(verify_folding, G_vec, P, Ls, Rs, us, a_final)
+    assert ok, "Benchmark proof did not verify"
+    if record is not None:
+        record["verify_folding"] = _phase(t)
+    if backend.library:
+        ok, t = _timed(ipa.verify, G_vec, P, Ls, Rs, us, a_final)
+        assert ok, "Benchmark proof did not verify"
+        if record is not None:
+            record["verify_msm"] = _phase(t)
+
+        # The two-vector argument, with H the generators in reverse order and
+        # Q = G_0 (fine for timing only)
+        H_vec = G_vec[::-1]
+        b = [rng.randrange(p) for _ in a]
+        _, t = _timed(ipa.prove_inner_product, G_vec, H_vec, G_vec[0], a, b, lambda L, R: rng.randrange(1, p))
+        if record is not None:
+            record["prove_inner_product"] = _phase(t)
+
+def benchmark(backend, n, seed=0, memory=True, executor=None):
+    """
+    Benchmark one backend at vector size n.
+
+    Parameters:
+    - executor: process pool for backends with parallel=True
+
+    Returns:
+    - dict with the timings of every phase and, if memory is True, the peak
+      traced memory in bytes of one full run
+    """
+    rng = random.Random(seed)
+    G_vec, a = random_instance(n, rng)
+    record = {"backend": backend.name, "n": n}
+    run_protocol(backend, G_vec, a, random.Random(seed + 1), record, executor)
+    if memory:
+        tracemalloc.start()
+        run_protocol(backend, G_vec, a, random.Random(seed + 1), executor=executor)
+        record["peak_memory_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return record
+
+def _print_record(record, out):
+    def fmt(phase):
+        return "%10.4fs %10.1f/s" % (phase["seconds"], phase["ops_per_sec"] or 0)
+    print("%-19s n=%-6d commit %s  prove %s  verify %s%s%s%s" % (
+        record["backend"], record["n"], fmt(record["commit"]), fmt(record["prove"]),
+        fmt(record["verify_folding"]),
+        ("  verify-msm " + fmt(record["verify_msm"])) if "verify_msm" in record else "",
+        ("  ip-prove " + fmt(record["prove_inner_product"])) if "prove_inner_product" in record else "",
+        ("  peak %.1f MiB" % (record["peak_memory_bytes"] / 2**20)) if "peak_memory_bytes" in record else "",
+    ), file=out)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark commit, prove and verify across vector sizes.")
+    parser.add_argument("--min-log", type=int, default=1, help="smallest n is 2^min_log")
+    parser.add_argument("--max-log", type=int, default=8, help="largest n is 2^max_log (up to 16)")
+    parser.add_argument("--backend", action="append", choices=sorted(BACKENDS),
+                        help="backend to run (repeatable); defaults to all projective backends")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true", help="skip the peak memory pass")
+    parser.add_argument("--workers", type=int, help="processes for projective-parallel (default os.cpu_count())")
+    parser.add_argument("--json", metavar="PATH", help="write results as JSON to PATH ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    backends = args.backend or ["projective-msm", "projective-parallel"]
+    # Human-readable lines go to stderr when the JSON goes to stdout
+    out = sys.stderr if args.json == "-" else sys.stdout
+    executor = None
+    if any(BACKENDS[name].parallel for name in backends):
+        from concurrent.futures import ProcessPoolExecutor
+        executor = ProcessPoolExecutor(args.workers)
+    results = []
+    try:
+        for k in range(args.min_log, args.max_log + 1):
+            for name in backends:
+                record = benchmark(BACKENDS[name], 2 ** k, args.seed, not args.no_memory, executor)
+                _print_record(record, out)
+                results.append(record)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    if args.json == "-":
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    elif args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return results
+
+if __name__ == "__main__":
+    main()
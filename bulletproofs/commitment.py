@@ -0,0 +1,165 @@
+"""
+Commitments that are updated in place when a few entries of the vector change.
+
+A vector commitment P = <a, G> is linear in a, so changing a_i from old to new
+only moves it by (new - old) G_i:
+
+    C = VectorCommitment(G_vec, a)
+    C.update(3, a[3], 17)                        # P += (17 - a[3]) G_3
+    C.update_many([(0, a[0], 5), (9, a[9], 1)])  # one MSM over the changes
+    P = C.commitment
+
+so k changed entries cost an MSM of size k instead of a recommit of size n.
+
+InnerProductCommitments keeps the chapter 5 commitments A, S, V, T1, T2 of
+a pair of vectors a, b current in the same way. When a_i changes by d:
+
+    A  += d G_i
+    V  += d b_i g          since v = <a, b>
+    T1 += d sR_i g         since t1 = <a, sR> + <b, sL>
+
+and symmetrically for b (with H_i and sL_i). S and T2 depend only on sL and sR
+and never change.
+"""
+from bulletproofs.curve import curve_order as p
+from bulletproofs.curve import RAW_INF, raw_add, to_raw, from_raw
+from bulletproofs.msm import raw_msm
+from bulletproofs import scalars
+
+class VectorCommitment:
+    """
+    The commitment P = <values, points>, kept up to date under sparse changes.
+
+    Parameters:
+    - points: list of elliptic curve points (the basis)
+    - values: initial scalars, or None to start from P = 0
+
+    The object does not store the vector itself: callers pass the old value
+    of every entry they change.
+    """
+    def __init__(self, points, values=None):
+        self.points = [to_raw(G) for G in points]
+        if values is None:
+            self._P = RAW_INF
+        else:
+            assert len(values) == len(self.points), "Need one value per point"
+            self._P = raw_msm(self.points, [v % p for v in values])
+
+    @property
+    def commitment(self):
+        return from_raw(self._P)
+
+    def update(self, index, old, new):
+        """
+        Change entry `index` from `old` to `new`: P += (new - old) G_index.
+        """
+        self.update_many([(index, old, new)])
+
+    def update_many(self, changes):
+        """
+        Apply several changes with one multi-scalar multiplication.
+
+        Parameters:
+        - changes: iterable of (index, old, new); an index may appear more
+          than once, in which case the changes are applied in order
+        """
+        changes = [(i, (new - old) % p) for i, old, new in changes]
+        self._P = raw_add(self._P, raw_msm([self.points[i] for i, _ in changes], [d for _, d in changes]))
+
+class InnerProductCommitments:
+    """
+    The chapter 5 commitments of a and b, kept up to date as entries change:
+
+        A  = <a, G> + <b, H> + alpha B        S  = <sL, G> + <sR, H> + beta B
+        V  = v g + gamma B                    v  = <a, b>
+        T1 = t1 g + tau_1 B                   t1 = <a, sR> + <b, sL>
+        T2 = t2 g + tau_2 B                   t2 = <sL, sR>
+
+    Parameters:
+    - G, H: lists of n points
+    - B: blinding point
+    - g: point for the scalar commitments V, T1, T2 (chapter 5 uses G[0])
+    - a, b, sL, sR: scalar vectors of length n
+    - alpha, beta, gamma, tau_1, tau_2: blinding terms
+
+    The vectors are copied; read a, b, v, t1, t2 and the commitments from
+    the attributes of the same names.
+    """
+    def __init__(self, G, H, B, g, a, b, sL, sR, alpha, beta, gamma, tau_1, tau_2):
+        n = len(G)
+        assert len(H) == len(a) == len(b) == len(sL) == len(sR) == n, "All vectors must have length n"
+        self.n = n
+        self.g = to_raw(g)
+        self.a = [x % p for x in a]
+        self.b = [x % p for x in b]
+        self.sL = [x % p for x in sL]
+        self.sR = [x % p for x in sR]
+        self.v = scalars.inner_product(self.a, self.b)
+        self.t1 = (scalars.inner_product(self.a, self.sR) + scalars.inner_product(self.b, self.sL)) % p
+        self.t2 = scalars.inner_product(self.sL, self.sR)
+        self._A = VectorCommitment(G + H + [B], self.a + self.b + [alpha])
+        basis = self._A.points
+        g, B = self.g, basis[-1]
+        self._S = raw_msm(basis, self.sL + self.sR + [beta % p])
+        self._V = raw_msm([g, B], [self.v, gamma % p])
+        self._T1 = raw_msm([g, B], [self.t1, tau_1 % p])
+        self._T2 = raw_msm([g, B], [self.t2, tau_2 % p])
+
+    @property
+    def A(self):
+        return self._A.commitment
+
+    @property
+    def S(self):
+        return from_raw(self._S)
+
+    @property
+    def V(self):
+        return from_raw(self._V)
+
+    @property
+    def T1(self):
+        return from_raw(self._T1)
+
+    @property
+    def T2(self):
+        return from_raw(self._T2)
+
+    def commitments(self):
+        """
+        Return (A, S, V, T1, T2), as chapter 5's commit() does.
+        """
+        return (self.A, self.S, self.V, self.T1, self.T2)
+
+    def update_a(self, changes):
+        """
+        Set a_i = new for every (i, new) in `changes` (a dict or an iterable of pairs).
+        """
+        self._update(changes, self.a, self.b, self.sR, 0)
+
+    def update_b(self, changes):
+        """
+        Set b_i = new for every (i, new) in `changes` (a dict or an iterable of pairs).
+        """
+        self._update(changes, self.b, self.a, self.sL, self.n)
+
+    def _update(self, changes, vec, other, s, offset):
+        # vec is the vector being changed, other the one it is multiplied with
+        # in v, and s the blinding vector it is multiplied with in t1
+        changes = changes.items() if isinstance(changes, dict) else changes
+        deltas = []
+        dv = dt1 = 0
+        for i, new in changes:
+            new %= p
+            d = (new - vec[i]) % p
+            vec[i] = new
+            deltas.append((offset + i, 0, d))
+            dv += d * other[i]
+            dt1 += d * s[i]
+        self._A.update_many(deltas)
+        dv %= p
+        dt1 %= p
+        self.v = (self.v + dv) % p
+        self.t1 = (self.t1 + dt1) % p
+        self._V = raw_add(self._V, raw_msm([self.g], [dv]))
+        self._T1 = raw_add(self._T1, raw_msm([self.g], [dt1]))
@@ -0,0 +1,233 @@
+"""
+BN128 (alt_bn128 / BN254) G1 arithmetic in Jacobian coordinates.
+
+This module mirrors the `add`, `multiply`, `eq`, `neg`, `double`, `Z1` surface of
+`py_ecc.bn128`, so a chapter can switch by changing its import line. Points
+are represented as tuples (X, Y, Z) of `FQ` elements standing for the affine
+point (X / Z^2, Y / Z^3), which lets additions and doublings run without any
+field inversion. Affine points (x, y), e.g. the hardcoded generators, are
+accepted everywhere as inputs; `normalize` converts back to affine form.
+
+Internally the formulas work on "raw" points: tuples of three Python ints
+modulo the field modulus. Other modules that do heavy point work (e.g. the MSM)
+use the raw_* functions directly to avoid creating `FQ` objects in hot loops.
+The ints are of the type chosen by bulletproofs.field: gmpy2 `mpz` when it
+is available, Python ints otherwise.
+"""
+from py_ecc.bn128 import FQ, field_modulus, curve_order
+from py_ecc.bn128 import G1 as G1_affine
+from bulletproofs.scalars import batch_inverse
+from bulletproofs import glv
+from bulletproofs import field
+
+# Curve parameter 'b' in the equation y^2 = x^3 + b
+b = 3
+
+# The field modulus in the backend's integer type (see bulletproofs.field)
+q = field.q
+
+# Raw point at infinity (Z == 0)
+RAW_INF = (1, 1, 0)
+
+# Fixed-base tables keyed by affine (x, y), filled by fixed_base.precompute
+fixed_base_tables = {}
+
+def raw_is_inf(P):
+    return P[2] == 0
+
+def raw_double(P):
+    X1, Y1, Z1 = P
+    if Z1 == 0 or Y1 == 0:
+        return RAW_INF
+    # dbl-2009-l, for curves with a = 0
+    A = X1 * X1 % q
+    B = Y1 * Y1 % q
+    C = B * B % q
+    D = 2 * ((X1 + B) * (X1 + B) - A - C) % q
+    E = 3 * A % q
+    X3 = (E * E - 2 * D) % q
+    Y3 = (E * (D - X3) - 8 * C) % q
+    Z3 = 2 * Y1 * Z1 % q
+    return (X3, Y3, Z3)
+
+def raw_add(P, Q):
+    X1, Y1, Z1 = P
+    X2, Y2, Z2 = Q
+    if Z1 == 0:
+        return Q
+    if Z2 == 0:
+        return P
+    Z1Z1 = Z1 * Z1 % q
+    U2 = X2 * Z1Z1 % q
+    S2 = Y2 * Z1 * Z1Z1 % q
+    if Z2 == 1:
+        # Mixed addition: Q is affine, which saves four multiplications
+        U1 = X1
+        S1 = Y1
+    else:
+        Z2Z2 = Z2 * Z2 % q
+        U1 = X1 * Z2Z2 % q
+        S1 = Y1 * Z2 * Z2Z2 % q
+    H = (U2 - U1) % q
+    R = (S2 - S1) % q
+    if H == 0:
+        # Same x coordinate: either P == Q or P == -Q
+        return raw_double(P) if R == 0 else RAW_INF
+    H2 = H * H % q
+    H3 = H * H2 % q
+    U1H2 = U1 * H2 % q
+    X3 = (R * R - H3 - 2 * U1H2) % q
+    Y3 = (R * (U1H2 - X3) - S1 * H3) % q
+    Z3 = H * Z1 % q if Z2 == 1 else H * Z1 * Z2 % q
+    return (X3, Y3, Z3)
+
+def raw_neg(P):
+    return (P[0], -P[1] % q, P[2])
+
+def raw_multiply(P, n):
+    """
+    Scalar multiplication on a raw point.
+
+    n is split with the GLV endomorphism into n1 + n2 LAMBDA, and
+    n1 P + n2 phi(P) is computed in one wNAF double-and-add pass over the
+    ~128-bit halves (see bulletproofs.glv), which halves the doublings.
+
+    If P is an affine generator registered with fixed_base.precompute, its
+    precomputed table is used instead.
+    """
+    n %= curve_order
+    if n == 0 or raw_is_inf(P):
+        return RAW_INF
+    if P[2] == 1 and fixed_base_tables:
+        table = fixed_base_tables.get((P[0], P[1]))
+        if table is not None:
+            return table.multiply(n)
+    n1, n2 = glv.decompose(n)
+    w = glv.window_size(max(abs(n1), abs(n2)).bit_length())
+    # Odd multiples P, 3P, 5P, ... and their images phi(X, Y, Z) = (BETA X, Y, Z)
+    P2 = raw_double(P)
+    table = [P]
+    for _ in range(2 ** (w - 2) - 1):
+        table.append(raw_add(table[-1], P2))
+    phi_table = [(glv.BETA * X % q, Y, Z) for X, Y, Z in table]
+    # A negative half uses the negated table, as (-n) P = n (-P)
+    if n1 < 0:
+        n1, table = -n1, [raw_neg(T) for T in table]
+    if n2 < 0:
+        n2, phi_table = -n2, [raw_neg(T) for T in phi_table]
+    digits1, digits2 = glv.wnaf(n1, w), glv.wnaf(n2, w)
+    length = max(len(digits1), len(digits2))
+    digits1 += [0] * (length - len(digits1))
+    digits2 += [0] * (length - len(digits2))
+    result = RAW_INF
+    for i in range(length - 1, -1, -1):
+        result = raw_double(result)
+        d = digits1[i]
+        if d:
+            result = raw_add(result, table[d >> 1] if d > 0 else raw_neg(table[-d >> 1]))
+        d = digits2[i]
+        if d:
+            result = raw_add(result, phi_table[d >> 1] if d > 0 else raw_neg(phi_table[-d >> 1]))
+    return result
+
+def raw_eq(P, Q):
+    X1, Y1, Z1 = P
+    X2, Y2, Z2 = Q
+    if Z1 == 0 or Z2 == 0:
+        return Z1 == Z2
+    Z1Z1 = Z1 * Z1 % q
+    Z2Z2 = Z2 * Z2 % q
+    return (X1 * Z2Z2 - X2 * Z1Z1) % q == 0 and (Y1 * Z2 * Z2Z2 - Y2 * Z1 * Z1Z1) % q == 0
+
+def raw_normalize(P):
+    """
+    Return the affine coordinates (x, y) of a raw point, or None at infinity.
+    """
+    X, Y, Z = P
+    if Z == 0:
+        return None
+    if Z == 1:
+        return (X, Y)
+    z_inv = field.inverse(Z, q)
+    z_inv2 = z_inv * z_inv % q
+    return (X * z_inv2 % q, Y * z_inv2 * z_inv % q)
+
+def raw_normalize_batch(points):
+    """
+    Convert a list of raw points to raw affine form (x, y, 1) with one inversion.
+
+    Points at infinity and points that are already affine are passed through.
+    """
+    todo = [i for i, P in enumerate(points) if P[2] != 0 and P[2] != 1]
+    if not todo:
+        return list(points)
+    normalized = list(points)
+    z_invs = batch_inverse([points[i][2] for i in todo], q)
+    for i, z_inv in zip(todo, z_invs):
+        X, Y, _ = points[i]
+        z_inv2 = z_inv * z_inv % q
+        normalized[i] = (X * z_inv2 % q, Y * z_inv2 * z_inv % q, 1)
+    return normalized
+
+def to_raw(P):
+    """
+    Convert a point in any accepted form to a raw (X, Y, Z) tuple of ints.
+
+    Accepted forms are None (py_ecc's point at infinity), affine (x, y) and
+    Jacobian (X, Y, Z), with coordinates given as `FQ` elements or ints.
+    """
+    if P is None:
+        return RAW_INF
+    element = field.element
+    if len(P) == 2:
+        return (element(int(P[0])), element(int(P[1])), 1)
+    return (element(int(P[0])), element(int(P[1])), element(int(P[2])))
+
+def from_raw(P):
+    return (FQ(int(P[0])), FQ(int(P[1])), FQ(int(P[2])))
+
+# Point at infinity and generator, in Jacobian form
+Z1 = from_raw(RAW_INF)
+G1 = from_raw(to_raw(G1_affine))
+
+def is_inf(P):
+    return raw_is_inf(to_raw(P))
+
+def is_on_curve(P):
+    X, Y, Z = to_raw(P)
+    if Z == 0:
+        return True
+    # y^2 = x^3 + b with x = X / Z^2, y = Y / Z^3
+    Z6 = pow(Z, 6, q)
+    return (Y * Y - X * X * X - b * Z6) % q == 0
+
+def add(P, Q):
+    return from_raw(raw_add(to_raw(P), to_raw(Q)))
+
+def double(P):
+    return from_raw(raw_double(to_raw(P)))
+
+def neg(P):
+    return from_raw(raw_neg(to_raw(P)))
+
+def multiply(P, n):
+    return from_raw(raw_multiply(to_raw(P), n))
+
+def eq(P, Q):
+    return raw_eq(to_raw(P), to_raw(Q))
+
+def normalize(P):
+    """
+    Convert a point to affine (FQ(x), FQ(y)) form, or None for the point at infinity.
+    """
+    affine = raw_normalize(to_raw(P))
+    if affine is None:
+        return None
+    return (FQ(int(affine[0])), FQ(int(affine[1])))
+
+def normalize_batch(points):
+    """
+    Convert a list of points to affine form using a single field inversion.
+    """
+    return [None if P[2] == 0 else (FQ(int(P[0])), FQ(int(P[1])))
+            for P in raw_normalize_batch([to_raw(P) for P in points])]
@@ -0,0 +1,63 @@
+"""
+Integer backend for the field arithmetic of the raw point formulas.
+
+The raw_* functions of bulletproofs.curve only use +, -, *, % and pow on
+their coordinates, so any integer type with those operators can carry them.
+With gmpy2 installed, coordinates are gmpy2 `mpz` values: a 254-bit
+multiply-and-reduce is about 2x faster than with Python ints, and an
+inversion (gmpy2.invert) about 20x faster than pow(x, -1, q). Without it,
+plain Python ints are used and nothing changes.
+
+The backend is chosen once, at import time, from the BULLETPROOFS_FIELD
+environment variable:
+
+    BULLETPROOFS_FIELD=auto     gmpy2 if it can be imported, else python (default)
+    BULLETPROOFS_FIELD=gmpy2    gmpy2, and fail if it is missing
+    BULLETPROOFS_FIELD=python   Python ints
+
+Values of both backends compare and hash equal to the same Python int, so
+mixing them (e.g. looking up a fixed-base table with mpz coordinates) is
+safe. Code that needs a real int (FQ, to_bytes) converts with int().
+
+Montgomery form is not offered: in pure Python a REDC step costs three
+bignum multiplications and is slower than the single `%` it replaces.
+"""
+from py_ecc.bn128 import field_modulus
+import os
+
+BACKEND = os.environ.get("BULLETPROOFS_FIELD", "auto").lower()
+if BACKEND not in ("auto", "gmpy2", "python"):
+    raise ImportError("BULLETPROOFS_FIELD must be auto, gmpy2 or python, not %r" % BACKEND)
+
+gmpy2 = None
+if BACKEND != "python":
+    try:
+        import gmpy2
+    except ImportError:
+        if BACKEND == "gmpy2":
+            raise
+    BACKEND = "python" if gmpy2 is None else "gmpy2"
+
+if gmpy2 is not None:
+    element = gmpy2.mpz
+
+    def inverse(x, modulus=field_modulus):
+        """
+        Return 1 / x modulo `modulus`; raises ValueError if x is not invertible.
+        """
+        try:
+            return gmpy2.invert(x, modulus)
+        except ZeroDivisionError:
+            raise ValueError("base is not invertible for the given modulus")
+else:
+    element = int
+
+    def inverse(x, modulus=field_modulus):
+        """
+        Return 1 / x modulo `modulus`; raises ValueError if x is not invertible.
+        """
+        return pow(x, -1, modulus)
+
+# The field modulus in the backend's type; arithmetic reduced modulo it
+# yields values of that type
+q = element(field_modulus)
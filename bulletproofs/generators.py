@@ -0,0 +1,89 @@
+"""
+Indexable hash-to-curve derivation of generator points.
+
+Chapters 1 and 2 derive the basis with a hash chain, x_{i+1} = sha256(x_i),
+so point i is only available after points 0 .. i-1. Here point i depends only
+on (seed, i):
+
+    for counter = 0, 1, 2, ...:
+        h = sha256(seed || i as 8 bytes || counter as 4 bytes)
+        x = h mod q
+        if x^3 + 3 is a square mod q: stop
+
+Since q = 3 mod 4, the square root candidate is y = (x^3 + 3)^((q+1)/4), and
+y^2 = (x^3 + 3) * (x^3 + 3)^((q-1)/2) is (x^3 + 3) times its Legendre symbol
+(Euler's criterion). So one exponentiation both tests for a square and gives
+the root, and no libnum is needed. The top bit of h picks which of the two
+square roots is used.
+
+Because every index is independent, any range of generators can be derived on
+its own, sharded across machines, or computed in parallel with
+`derive_generators(..., executor=...)`. Use different seeds for independent
+vectors, e.g. b"RareSkills/G" and b"RareSkills/H".
+"""
+from bulletproofs.curve import FQ, field_modulus, b
+from hashlib import sha256
+
+q = field_modulus
+
+assert q % 4 == 3, "the square root shortcut needs q = 3 mod 4"
+
+def _seed_bytes(seed):
+    return seed.encode('ascii') if isinstance(seed, str) else bytes(seed)
+
+def _derive_raw(seed, index):
+    prefix = seed + index.to_bytes(8, 'big')
+    counter = 0
+    while True:
+        h = int.from_bytes(sha256(prefix + counter.to_bytes(4, 'big')).digest(), 'big')
+        x = h % q
+        rhs = (x * x * x + b) % q
+        y = pow(rhs, (q + 1) // 4, q)
+        # y^2 == rhs exactly when the Legendre symbol of rhs is 1
+        if y * y % q == rhs:
+            if h >> 255:
+                y = q - y
+            return (x, y)
+        counter += 1
+
+def derive_generator(seed, index):
+    """
+    Derive generator point number `index` for a seed.
+
+    Parameters:
+    - seed: str or bytes
+    - index: non-negative integer
+
+    Returns:
+    - (FQ(x), FQ(y)): an affine point with unknown discrete log
+    """
+    x, y = _derive_raw(_seed_bytes(seed), index)
+    return (FQ(x), FQ(y))
+
+def _derive_range(seed, start, stop):
+    return [_derive_raw(seed, i) for i in range(start, stop)]
+
+def derive_generators(seed, start, stop=None, executor=None, chunk_size=1024, raw=False):
+    """
+    Derive generators start .. stop - 1 (or 0 .. start - 1 if stop is omitted).
+
+    Parameters:
+    - seed: str or bytes
+    - start, stop: index range
+    - executor: optional concurrent.futures executor to derive chunks in parallel
+    - chunk_size: number of indices per submitted chunk
+    - raw: if True, return (x, y) int tuples instead of FQ points
+
+    Returns:
+    - list of affine points, in index order
+    """
+    if stop is None:
+        start, stop = 0, start
+    seed = _seed_bytes(seed)
+    if executor is None:
+        points = _derive_range(seed, start, stop)
+    else:
+        futures = [executor.submit(_derive_range, seed, i, min(i + chunk_size, stop))
+                   for i in range(start, stop, chunk_size)]
+        points = [P for f in futures for P in f.result()]
+    return points if raw else [(FQ(x), FQ(y)) for x, y in points]
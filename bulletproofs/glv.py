@@ -0,0 +1,96 @@
+"""
+Scalar decomposition for the GLV endomorphism of BN254 G1.
+
+BN254 has j-invariant 0, so for a cube root of unity BETA modulo the field
+modulus, phi(x, y) = (BETA x, y) maps the curve to itself, and on G1 it acts
+as multiplication by a cube root of unity LAMBDA modulo the curve order:
+
+    phi(P) = LAMBDA P
+
+Any scalar k splits as k = k1 + k2 LAMBDA (mod curve order) with k1 and k2 of
+about 128 bits, so k P = k1 P + k2 phi(P) needs only half as many doublings
+when both halves are processed together (Shamir's trick). The split rounds k
+against a short basis (A1, B1), (A2, B2) of the lattice
+{(a, b) : a + b LAMBDA = 0 mod curve order}.
+
+The halves are then recoded in width-w NAF (wnaf), whose nonzero digits are
+odd, at most 2^(w-1) in absolute value, and at least w positions apart, so an
+n-bit scalar costs about n / (w + 1) additions from a table of 2^(w-2) odd
+multiples. This module only does the integer part; curve.raw_multiply does
+the point part.
+"""
+from py_ecc.bn128 import field_modulus as q
+from py_ecc.bn128 import curve_order as r
+
+# phi(x, y) = (BETA x, y) is multiplication by LAMBDA on G1
+BETA = 2203960485148121921418603742825762020974279258880205651966
+LAMBDA = 4407920970296243842393367215006156084916469457145843978461
+
+# Short lattice basis from the extended Euclidean algorithm on (r, LAMBDA)
+A1, B1 = 9931322734385697763, -147946756881789319000765030803803410728
+A2, B2 = 147946756881789319010696353538189108491, 9931322734385697763
+
+assert pow(BETA, 3, q) == 1 and (LAMBDA * LAMBDA + LAMBDA + 1) % r == 0
+assert (A1 + B1 * LAMBDA) % r == 0 and (A2 + B2 * LAMBDA) % r == 0 and A1 * B2 - A2 * B1 == r
+
+def decompose(k):
+    """
+    Split a scalar into k1 + k2 LAMBDA (mod curve order).
+
+    Parameters:
+    - k: integer in [0, curve order)
+
+    Returns:
+    - (k1, k2): signed integers of at most about 128 bits
+    """
+    # c1, c2 are the rounded coordinates of (k, 0) in the lattice basis
+    c1 = (2 * B2 * k + r) // (2 * r)
+    c2 = (-2 * B1 * k + r) // (2 * r)
+    k1 = k - c1 * A1 - c2 * A2
+    k2 = -c1 * B1 - c2 * B2
+    return (k1, k2)
+
+def wnaf(k, w):
+    """
+    Width-w non-adjacent form of a non-negative integer.
+
+    Returns:
+    - digits: list of signed digits, least significant first, with
+      k == sum(d * 2^i for i, d in enumerate(digits))
+    """
+    digits = []
+    half = 1 << (w - 1)
+    mask = (1 << w) - 1
+    while k:
+        if k & 1:
+            d = k & mask
+            if d >= half:
+                d -= 1 << w
+            k -= d
+        else:
+            d = 0
+        digits.append(d)
+        k >>= 1
+    return digits
+
+def window_size(bits):
+    """
+    Pick the wNAF width for a pair of scalars of the given bit length.
+
+    A table of 2^(w-2) odd multiples is built for each of the two points (of
+    which only one costs additions, the other being its image under phi), and
+    each scalar costs about bits / (w + 1) additions.
+    """
+    def cost(w):
+        return 2 ** (w - 2) + 2 * bits // (w + 1)
+    return min(range(2, 8), key=cost)
+
+def multiply_cost(bits):
+    """
+    Estimated point operations of one GLV multiplication by a scalar of the
+    given bit length: about bits / 2 doublings, the wNAF additions of both
+    halves, and the table of odd multiples.
+    """
+    half = (bits + 1) // 2
+    w = window_size(half)
+    return half + 2 ** (w - 2) + 2 * half // (w + 1)
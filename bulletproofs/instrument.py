@@ -0,0 +1,224 @@
+"""
+Opt-in operation counting and phase timing for the proving pipeline.
+
+    from bulletproofs.instrument import Profiler
+
+    with Profiler() as prof:
+        with prof.phase("commit"):
+            P = msm(G_vec, a)
+        proof = ipa.prove(G_vec, a, challenge)     # records "main/round 1", ...
+        ipa.verify(G_vec, P, *proof)                # records "main/verify"
+    print(prof.to_json())
+
+While a Profiler is active, the raw point and scalar functions of every loaded
+bulletproofs module are swapped for counting wrappers; on exit the original
+functions are put back. Nothing is checked in the hot code itself, so when no
+Profiler is running there is no overhead at all. The only hook left in place
+is `phase`, which the protocol code calls once per round and which returns a
+shared no-op context manager when profiling is off.
+
+Counters (each tallied into the innermost active phase):
+
+    point_add, point_double    Jacobian additions and doublings
+    scalar_mul                 variable- or fixed-base scalar multiplications
+    msm, msm_terms             multi-scalar multiplications and their total size
+    field_mul, field_inv       base field multiplications (derived from the
+                               formula cost of each point operation) and inversions
+    scalar_field_mul, scalar_field_inv
+                               the same, modulo the curve order
+
+Work done in worker processes (bulletproofs.parallel) is not counted.
+"""
+from bulletproofs import curve, msm, scalars
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+import json
+import sys
+import time
+
+# Field multiplications per formula in curve.py
+ADD_MIXED_COST = 11
+ADD_COST = 16
+DOUBLE_COST = 7
+NORMALIZE_COST = 3
+
+_active = None
+_NULL_PHASE = nullcontext()
+
+def phase(name, index=None):
+    """
+    Mark a protocol phase for the active Profiler, if any.
+
+    Parameters:
+    - name: phase name, e.g. "round" or "verify"
+    - index: optional number appended to the name, e.g. the round number
+    """
+    if _active is None:
+        return _NULL_PHASE
+    return _active.phase(name if index is None else "%s %d" % (name, index))
+
+class Profiler:
+    """
+    Context manager that counts operations and records wall time per phase.
+
+    Parameters:
+    - count: if False, only record the wall time of phases, without swapping
+      in the counting wrappers (whose overhead would distort the times)
+    """
+    def __init__(self, count=True):
+        self.count = count
+        self.counts = {}
+        self.wall_time = {}
+        self._stack = ["main"]
+        self._patched = []
+
+    def _count(self, op, k=1):
+        counts = self.counts.get(self._stack[-1])
+        if counts is None:
+            counts = self.counts[self._stack[-1]] = Counter()
+        counts[op] += k
+
+    @contextmanager
+    def phase(self, name):
+        self._stack.append(self._stack[-1] + "/" + name)
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            path = self._stack.pop()
+            self.wall_time[path] = self.wall_time.get(path, 0) + time.perf_counter() - start
+
+    def _wrappers(self):
+        count = self._count
+        q, order, tables = curve.q, curve.curve_order, curve.fixed_base_tables
+        raw_add, raw_double, raw_multiply = curve.raw_add, curve.raw_double, curve.raw_multiply
+        raw_normalize, batch_inverse, raw_msm = curve.raw_normalize, scalars.batch_inverse, msm.raw_msm
+        fold, fold_in_place, inverse = scalars.fold, scalars.fold_in_place, scalars.inverse
+        inner_product, hadamard, evaluate = scalars.inner_product, scalars.hadamard, scalars.evaluate
+
+        def counted_add(P, Q):
+            if P[2] and Q[2]:
+                count("point_add")
+                count("field_mul", ADD_MIXED_COST if Q[2] == 1 else ADD_COST)
+            return raw_add(P, Q)
+
+        def counted_double(P):
+            count("point_double")
+            count("field_mul", DOUBLE_COST)
+            return raw_double(P)
+
+        def counted_multiply(P, n):
+            count("scalar_mul")
+            return raw_multiply(P, n)
+
+        def counted_normalize(P):
+            if P[2] not in (0, 1):
+                count("field_inv")
+                count("field_mul", NORMALIZE_COST)
+            return raw_normalize(P)
+
+        def counted_batch_inverse(values, modulus=curve.curve_order):
+            prefix = "field" if modulus == q else "scalar_field"
+            if values:
+                count(prefix + "_inv")
+                count(prefix + "_mul", 3 * (len(values) - 1))
+            return batch_inverse(values, modulus)
+
+        # raw_msm multiplies terms whose base has a fixed-base table through the
+        # table directly, bypassing raw_multiply, so those are counted here
+        def counted_msm(points, scalars):
+            count("msm")
+            count("msm_terms", len(points))
+            if tables:
+                count("scalar_mul", sum(1 for P, s in zip(points, scalars)
+                                        if P[2] == 1 and s % order and (P[0], P[1]) in tables))
+            return raw_msm(points, scalars)
+
+        # A missing u_inv is computed with scalars.inverse, which counts itself
+        def counted_fold(scalar_vec, u, u_inv=None):
+            count("scalar_field_mul", len(scalar_vec))
+            return fold(scalar_vec, u, u_inv)
+
+        def counted_fold_in_place(scalar_vec, u, u_inv=None):
+            count("scalar_field_mul", len(scalar_vec))
+            return fold_in_place(scalar_vec, u, u_inv)
+
+        def counted_inverse(value, modulus=curve.curve_order):
+            count("field_inv" if modulus == q else "scalar_field_inv")
+            return inverse(value, modulus)
+
+        def counted_inner_product(a, b):
+            count("scalar_field_mul", len(a))
+            return inner_product(a, b)
+
+        def counted_hadamard(a, b):
+            count("scalar_field_mul", len(a))
+            return hadamard(a, b)
+
+        def counted_evaluate(coeff_vecs, u):
+            count("scalar_field_mul", len(coeff_vecs[0]) * (len(coeff_vecs) - 1))
+            return evaluate(coeff_vecs, u)
+
+        return {
+            raw_add: counted_add,
+            raw_double: counted_double,
+            raw_multiply: counted_multiply,
+            raw_normalize: counted_normalize,
+            batch_inverse: counted_batch_inverse,
+            raw_msm: counted_msm,
+            fold: counted_fold,
+            fold_in_place: counted_fold_in_place,
+            inverse: counted_inverse,
+            inner_product: counted_inner_product,
+            hadamard: counted_hadamard,
+            evaluate: counted_evaluate,
+        }
+
+    def __enter__(self):
+        global _active
+        assert _active is None, "Only one Profiler can be active at a time"
+        wrappers = self._wrappers() if self.count else {}
+        # Modules import these functions by name, so every module that holds a
+        # reference gets its own binding replaced
+        for name, module in list(sys.modules.items()):
+            if module is None or not name.startswith("bulletproofs"):
+                continue
+            for attr, value in list(vars(module).items()):
+                if callable(value) and value in wrappers:
+                    setattr(module, attr, wrappers[value])
+                    self._patched.append((module, attr, value))
+        _active = self
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        global _active
+        self.wall_time["main"] = time.perf_counter() - self._start
+        for module, attr, value in reversed(self._patched):
+            setattr(module, attr, value)
+        self._patched = []
+        _active = None
+        return False
+
+    def report(self):
+        """
+        Return the results as a dict:
+            {"total": {op: count}, "phases": {path: {"wall_time": s, "ops": {op: count}}}}
+
+        Phase paths look like "main/round 1"; the ops of a phase do not
+        include those of its nested phases, while "total" covers everything.
+        """
+        total = Counter()
+        for counts in self.counts.values():
+            total.update(counts)
+        paths = sorted(set(self.counts) | set(self.wall_time))
+        return {
+            "total": dict(total),
+            "phases": {
+                path: {"wall_time": self.wall_time.get(path), "ops": dict(self.counts.get(path, {}))}
+                for path in paths
+            },
+        }
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.report(), **kwargs)
@@ -0,0 +1,454 @@
+"""
+The log n folding argument from chapter 7: proving knowledge of an opening a
+of P = <a, G_vec> by folding a and G_vec in half each round.
+
+Round j sends L_j = sum_i a_{2i} G_{2i+1} and R_j = sum_i a_{2i+1} G_{2i},
+receives a challenge u_j, and folds
+    a'_i = a_{2i} u_j + a_{2i+1} u_j^-1
+    G'_i = G_{2i} u_j^-1 + G_{2i+1} u_j
+After log n rounds a single scalar a'' is left, and the verifier checks
+    a'' G'' == sum_j (L_j u_j^2) + P + sum_j (R_j u_j^-2)
+
+n does not have to be a power of two. When a round starts with an odd
+length, the last a_i and G_i have no partner: they are left out of L and R
+and carried into the next round unchanged, which keeps
+<a', G'> = L u^2 + <a, G> + R u^-2. A vector of length n takes
+ceil(log2 n) rounds, with no zero padding.
+
+The provers convert the points to raw int tuples once (see curve.py) and run
+every round on those, folding the generator and scalar lists in place, so no
+FQ objects or new lists are created per round; only L and R are converted
+back, when they are sent.
+"""
+from bulletproofs.curve import curve_order as p
+from bulletproofs.curve import multiply, eq, is_inf
+from bulletproofs.curve import raw_add, raw_multiply, to_raw, from_raw
+from bulletproofs.msm import msm, raw_msm
+from bulletproofs.scalars import batch_inverse
+from bulletproofs import scalars, parallel, instrument
+
+def num_rounds(n):
+    """
+    Number of folding rounds for a vector of length n, i.e. ceil(log2 n).
+    """
+    return (n - 1).bit_length()
+
+def round_lengths(n):
+    """
+    Vector length at the start of every round: n, ceil(n / 2), ..., 2.
+    """
+    lengths = []
+    while n > 1:
+        lengths.append(n)
+        n = (n + 1) // 2
+    return lengths
+
+def fold(scalar_vec, u, u_inv=None):
+    """
+    Fold a scalar vector using a challenge scalar u.
+
+    Parameters:
+    - scalar_vec: list of scalars (integers modulo p)
+    - u: challenge scalar
+    - u_inv: u^-1 modulo p, if the caller already has it
+
+    Returns:
+    - folded_vec: list of scalars a_{2i} u + a_{2i+1} u^-1, plus the last
+      scalar unchanged if the length is odd
+    """
+    return scalars.fold(scalar_vec, u, u_inv)
+
+def fold_points(point_vec, u, u_inv=None):
+    """
+    Fold a point vector using a challenge scalar u.
+
+    Parameters:
+    - point_vec: list of elliptic curve points
+    - u: challenge scalar (pass u^-1 to fold the generators of the argument)
+    - u_inv: u^-1 modulo p, if the caller already has it
+
+    Returns:
+    - folded_vec: list of points G_{2i} u + G_{2i+1} u^-1, plus the last
+      point unchanged if the length is odd
+    """
+    if u_inv is None:
+        u_inv = scalars.inverse(u)
+    raw_points = [to_raw(P) for P in point_vec]
+    raw_fold_points_in_place(raw_points, u, u_inv)
+    return [from_raw(P) for P in raw_points]
+
+def raw_fold_points_in_place(points, u, u_inv):
+    """
+    Fold a list of raw points in place, like fold_points.
+    """
+    n = len(points)
+    for i in range(n // 2):
+        points[i] = raw_add(raw_multiply(points[2 * i], u), raw_multiply(points[2 * i + 1], u_inv))
+    if n % 2:
+        points[n // 2] = points[-1]
+    del points[(n + 1) // 2:]
+
+def compute_secondary_diagonal(G_vec, a):
+    """
+    Compute the L and R commitments for one round of the argument.
+
+    Parameters:
+    - G_vec: list of elliptic curve points
+    - a: list of scalars
+
+    Returns:
+    - (L, R): L = sum_i a_{2i} G_{2i+1}, R = sum_i a_{2i+1} G_{2i}, over
+      the pairs only (an unpaired last element is carried, not committed)
+    """
+    L, R = raw_compute_secondary_diagonal([to_raw(G) for G in G_vec], a)
+    return (from_raw(L), from_raw(R))
+
+def raw_compute_secondary_diagonal(G_vec, a):
+    # compute_secondary_diagonal on raw points, returning raw L and R
+    assert len(G_vec) == len(a), "Unequal length of G_vec and a"
+    m = len(a) - len(a) % 2
+    L = raw_msm(G_vec[1:m:2], a[0:m:2])
+    R = raw_msm(G_vec[0:m:2], a[1:m:2])
+    return (L, R)
+
+def prove(G_vec, a, challenge, executor=None):
+    """
+    Run the prover side of the argument.
+
+    Parameters:
+    - G_vec: list of elliptic curve points, of any length
+    - a: list of scalars, same length as G_vec
+    - challenge: function (L, R) -> u returning the verifier's challenge for a round
+    - executor: optional ProcessPoolExecutor; if given, L, R and the point folds
+      are computed in parallel (see bulletproofs.parallel)
+
+    Returns:
+    - (Ls, Rs, us, a_final): per-round L and R, the challenges, and the final scalar
+    """
+    assert len(G_vec) == len(a), "Unequal length of G_vec and a"
+    # Working copies, folded in place every round
+    G_vec = [to_raw(G) for G in G_vec]
+    a = [x % p for x in a]
+    Ls, Rs, us = [], [], []
+    while len(a) > 1:
+        with instrument.phase("round", len(us) + 1):
+            if executor is None:
+                L, R = raw_compute_secondary_diagonal(G_vec, a)
+                L, R = from_raw(L), from_raw(R)
+            else:
+                L, R = parallel.parallel_compute_secondary_diagonal(G_vec, a, executor)
+            u = challenge(L, R)
+            u_inv = scalars.inverse(u)
+            scalars.fold_in_place(a, u, u_inv)
+            if executor is None:
+                raw_fold_points_in_place(G_vec, u_inv, u)
+            else:
+                G_vec = parallel.raw_parallel_fold_points(G_vec, u_inv, executor, u)
+        Ls.append(L)
+        Rs.append(R)
+        us.append(u)
+    return (Ls, Rs, us, a[0])
+
+def verify_folding(G_vec, P, Ls, Rs, us, a_final):
+    """
+    Verify by folding G_vec explicitly every round, as done in chapter 7.
+
+    Returns False also if the number of rounds does not match the length of G_vec.
+    """
+    if not num_rounds(len(G_vec)) == len(Ls) == len(Rs) == len(us):
+        return False
+    with instrument.phase("verify_folding"):
+        return _verify_folding(G_vec, P, Ls, Rs, us, a_final)
+
+def _verify_folding(G_vec, P, Ls, Rs, us, a_final):
+    u_invs = batch_inverse(us)
+    for u, u_inv in zip(us, u_invs):
+        G_vec = fold_points(G_vec, u_inv, u)
+    left_side = multiply(G_vec[0], a_final)
+    right_side = msm(
+        Ls + [P] + Rs,
+        [u * u for u in us] + [1] + [u_inv * u_inv for u_inv in u_invs]
+    )
+    return eq(left_side, right_side)
+
+def challenge_scalars(us, u_invs=None, n=None):
+    """
+    Compute the scalars s_i such that the fully folded generator is
+    G'' = sum_i s_i G_i.
+
+    For n a power of two, in round j the generator at index i is scaled by
+    u_j^-1 if bit j of i is 0 and by u_j if it is 1 (bit 0 being the first
+    round), so s_i is the product of those factors over all rounds. A
+    generator carried through a round is not scaled in that round.
+
+    Parameters:
+    - us: list of challenges, one per round, in the order they were used
+    - u_invs: their inverses, if the caller already has them
+    - n: length of the original vector (default 2^len(us))
+
+    Returns:
+    - s: list of n scalars modulo p
+    """
+    if u_invs is None:
+        u_invs = batch_inverse(us)
+    if n is None:
+        n = 2 ** len(us)
+    lengths = round_lengths(n)
+    assert len(lengths) == len(us), "Number of rounds does not match n"
+    s = [1]
+    # Expand from the last round back to the first: each coefficient of the
+    # folded vector splits into the two generators it was folded from, and
+    # the last one is carried over as is when that round had an odd length
+    for u, u_inv, m in zip(reversed(us), reversed(u_invs), reversed(lengths)):
+        expanded = [x for c in s[:m // 2] for x in (c * u_inv % p, c * u % p)]
+        if m % 2:
+            expanded.append(s[-1])
+        s = expanded
+    return s
+
+def verify(G_vec, P, Ls, Rs, us, a_final):
+    """
+    Verify the argument with a single multi-scalar multiplication.
+
+    Instead of folding G_vec round by round, the check
+        <a'' s, G> - sum_j (L_j u_j^2) - P - sum_j (R_j u_j^-2) == 0
+    is evaluated as one MSM of size n + 2 ceil(log2 n) + 1.
+
+    Parameters:
+    - G_vec: list of elliptic curve points
+    - P: the commitment <a, G_vec>
+    - Ls, Rs: per-round L and R points sent by the prover
+    - us: per-round challenges
+    - a_final: the final folded scalar
+
+    Returns:
+    - True if the proof is valid; False also if the number of rounds does
+      not match the length of G_vec
+    """
+    if not num_rounds(len(G_vec)) == len(Ls) == len(Rs) == len(us):
+        return False
+    with instrument.phase("verify"):
+        # One inversion for all challenges, reused for s and for the u^-2 terms
+        u_invs = batch_inverse(us)
+        s = challenge_scalars(us, u_invs, len(G_vec))
+        points = G_vec + Ls + [P] + Rs
+        scalars_ = [a_final * s_i for s_i in s]
+        scalars_ += [-u * u for u in us] + [-1] + [-u_inv * u_inv for u_inv in u_invs]
+        return is_inf(msm(points, scalars_))
+
+def transcript_challenges(transcript):
+    """
+    Return a challenge function for prove() that absorbs L and R into a
+    Fiat-Shamir transcript and squeezes u from it.
+    """
+    def challenge(L, R):
+        transcript.append_point(b"L", L)
+        transcript.append_point(b"R", R)
+        return transcript.challenge_scalar(b"u")
+    return challenge
+
+def _start_transcript(transcript, n, P):
+    transcript.append_message(b"n", n.to_bytes(8, 'big'))
+    transcript.append_point(b"P", P)
+
+def prove_noninteractive(G_vec, a, P, transcript, executor=None):
+    """
+    Produce a complete proof in one pass, with challenges from a transcript.
+
+    Parameters:
+    - G_vec, a: as for prove
+    - P: the commitment <a, G_vec>, absorbed before the first round
+    - transcript: a bulletproofs.transcript.Transcript
+    - executor: as for prove
+
+    Returns:
+    - (Ls, Rs, a_final)
+    """
+    _start_transcript(transcript, len(a), P)
+    Ls, Rs, _, a_final = prove(G_vec, a, transcript_challenges(transcript), executor)
+    return (Ls, Rs, a_final)
+
+def verify_noninteractive(G_vec, P, Ls, Rs, a_final, transcript):
+    """
+    Verify a proof from prove_noninteractive, replaying the transcript to
+    recover the challenges.
+    """
+    if len(Ls) != len(Rs) or num_rounds(len(G_vec)) != len(Ls):
+        return False
+    _start_transcript(transcript, len(G_vec), P)
+    challenge = transcript_challenges(transcript)
+    us = [challenge(L, R) for L, R in zip(Ls, Rs)]
+    return verify(G_vec, P, Ls, Rs, us, a_final)
+
+# The two-vector argument of chapter 7b: knowledge of a, b with
+#     P = <a, G_vec> + <b, H_vec> + <a, b> Q
+# Each round folds
+#     a' = a_even u + a_odd u^-1        G' = G_even u^-1 + G_odd u
+#     b' = b_even u^-1 + b_odd u        H' = H_even u + H_odd u^-1
+# and sends
+#     L = <a_even, G_odd> + <b_odd, H_even> + <a_even, b_odd> Q
+#     R = <a_odd, G_even> + <b_even, H_odd> + <a_odd, b_even> Q
+# so that P' = L u^2 + P + R u^-2.
+
+def compute_inner_product_diagonal(G_vec, H_vec, Q, a, b):
+    """
+    Compute the L and R points for one round of the two-vector argument.
+    """
+    L, R = raw_compute_inner_product_diagonal(
+        [to_raw(G) for G in G_vec], [to_raw(H) for H in H_vec], to_raw(Q), a, b)
+    return (from_raw(L), from_raw(R))
+
+def raw_compute_inner_product_diagonal(G_vec, H_vec, Q, a, b):
+    # compute_inner_product_diagonal on raw points, returning raw L and R
+    L_points, L_scalars, R_points, R_scalars = _diagonal_terms(G_vec, H_vec, Q, a, b)
+    return (raw_msm(L_points, L_scalars), raw_msm(R_points, R_scalars))
+
+def _diagonal_terms(G_vec, H_vec, Q, a, b):
+    # The MSM terms of L and R, (L_points, L_scalars, R_points, R_scalars);
+    # an unpaired last element is left out
+    m = len(a) - len(a) % 2
+    a_even, a_odd, b_even, b_odd = a[0:m:2], a[1:m:2], b[0:m:2], b[1:m:2]
+    return (G_vec[1:m:2] + H_vec[0:m:2] + [Q], a_even + b_odd + [scalars.inner_product(a_even, b_odd)],
+            G_vec[0:m:2] + H_vec[1:m:2] + [Q], a_odd + b_even + [scalars.inner_product(a_odd, b_even)])
+
+class InnerProductRounds:
+    """
+    Round engine for the two-vector argument: one pass over the vectors per
+    round, in place, with reusable buffers.
+
+    The L and R of a round are one MSM each over buffers that hold the
+    concatenated halves
+        L: G_odd || H_even || Q  with scalars  a_even || b_odd || <a_even, b_odd>
+        R: G_even || H_odd || Q  with scalars  a_odd || b_even || <a_odd, b_even>
+    fold() folds a, b, G and H together, writing pair i to index i. As soon
+    as both elements of a pair of the next round are written, it copies them
+    into the buffers and adds their cross products, so the next round's L
+    and R are ready without another pass. All lists are overwritten and
+    truncated, never reallocated.
+
+    Parameters:
+    - G_vec, H_vec, Q, a, b: as for prove_inner_product; they are copied
+    """
+    def __init__(self, G_vec, H_vec, Q, a, b):
+        assert len(G_vec) == len(H_vec) == len(a) == len(b), "Vectors must be the same length"
+        self.G = [to_raw(G) for G in G_vec]
+        self.H = [to_raw(H) for H in H_vec]
+        self.Q = to_raw(Q)
+        self.a = [x % p for x in a]
+        self.b = [x % p for x in b]
+        # First-round buffers in the layout of raw_compute_inner_product_diagonal
+        self.L_points, self.L_scalars, self.R_points, self.R_scalars = _diagonal_terms(
+            self.G, self.H, self.Q, self.a, self.b)
+
+    def __len__(self):
+        return len(self.a)
+
+    def commitments(self):
+        """
+        Return the raw L and R of the current round.
+        """
+        return (raw_msm(self.L_points, self.L_scalars), raw_msm(self.R_points, self.R_scalars))
+
+    def fold(self, u, u_inv=None):
+        """
+        Fold a, b, G and H with the challenge u and prepare the next round's buffers.
+        """
+        if u_inv is None:
+            u_inv = scalars.inverse(u)
+        a, b, G, H = self.a, self.b, self.G, self.H
+        L_points, L_scalars, R_points, R_scalars = self.L_points, self.L_scalars, self.R_points, self.R_scalars
+        n = len(a)
+        half = n // 2
+        m = n - half
+        # Number of pairs in the next round; its buffers are h + h + 1 long
+        h = m // 2
+        cL = cR = 0
+
+        def gather(k):
+            # Copy pair k of the next round (indices 2k, 2k + 1) into the buffers
+            nonlocal cL, cR
+            a0, a1, b0, b1 = a[2 * k], a[2 * k + 1], b[2 * k], b[2 * k + 1]
+            L_points[k], L_points[h + k] = G[2 * k + 1], H[2 * k]
+            R_points[k], R_points[h + k] = G[2 * k], H[2 * k + 1]
+            L_scalars[k], L_scalars[h + k] = a0, b1
+            R_scalars[k], R_scalars[h + k] = a1, b0
+            cL += a0 * b1
+            cR += a1 * b0
+
+        for i in range(half):
+            j = 2 * i
+            a[i] = (a[j] * u + a[j + 1] * u_inv) % p
+            b[i] = (b[j] * u_inv + b[j + 1] * u) % p
+            G[i] = raw_add(raw_multiply(G[j], u_inv), raw_multiply(G[j + 1], u))
+            H[i] = raw_add(raw_multiply(H[j], u), raw_multiply(H[j + 1], u_inv))
+            if i % 2:
+                gather(i // 2)
+        if n % 2:
+            # The unpaired last element is carried over unchanged
+            a[half], b[half], G[half], H[half] = a[-1], b[-1], G[-1], H[-1]
+            if half % 2:
+                gather(half // 2)
+        for vec in (a, b, G, H):
+            del vec[m:]
+        L_points[2 * h], R_points[2 * h] = self.Q, self.Q
+        L_scalars[2 * h], R_scalars[2 * h] = cL % p, cR % p
+        for vec in (L_points, L_scalars, R_points, R_scalars):
+            del vec[2 * h + 1:]
+
+def prove_inner_product(G_vec, H_vec, Q, a, b, challenge):
+    """
+    Run the prover side of the two-vector argument with InnerProductRounds.
+
+    Parameters:
+    - G_vec, H_vec: lists of elliptic curve points, of any length
+    - Q: elliptic curve point for the inner product term
+    - a, b: lists of scalars
+    - challenge: function (L, R) -> u returning the verifier's challenge for a round
+
+    Returns:
+    - (Ls, Rs, us, a_final, b_final)
+    """
+    rounds = InnerProductRounds(G_vec, H_vec, Q, a, b)
+    Ls, Rs, us = [], [], []
+    while len(rounds) > 1:
+        with instrument.phase("round", len(us) + 1):
+            L, R = rounds.commitments()
+            L, R = from_raw(L), from_raw(R)
+            u = challenge(L, R)
+            rounds.fold(u)
+        Ls.append(L)
+        Rs.append(R)
+        us.append(u)
+    return (Ls, Rs, us, rounds.a[0], rounds.b[0])
+
+def inner_product_terms(G_vec, H_vec, Q, Ls, Rs, us, a_final, b_final, H_scale=None):
+    """
+    Return (points, scalars) of the single-MSM check of the two-vector argument,
+    without the -P term:
+        <a'' s, G> + <b'' s^-1, H> + a'' b'' Q - sum_j (L_j u_j^2) - sum_j (R_j u_j^-2)
+    which must equal P.
+
+    Parameters:
+    - H_scale: optional per-index factors c_i, to check against the generators
+      c_i H_i without computing those points
+    """
+    n = len(G_vec)
+    assert len(H_vec) == n and num_rounds(n) == len(us), "Number of rounds does not match the length of the vectors"
+    u_invs = batch_inverse(us)
+    s = challenge_scalars(us, u_invs, n)
+    # H folds with the inverse factors, so its scalars are the 1 / s_i
+    s_inv = challenge_scalars(u_invs, us, n)
+    if H_scale is not None:
+        s_inv = [x * c % p for x, c in zip(s_inv, H_scale)]
+    points = G_vec + H_vec + [Q] + Ls + Rs
+    scalars_ = [a_final * x % p for x in s] + [b_final * x % p for x in s_inv] + [a_final * b_final % p]
+    scalars_ += [-u * u for u in us] + [-u_inv * u_inv for u_inv in u_invs]
+    return (points, scalars_)
+
+def verify_inner_product(G_vec, H_vec, Q, P, Ls, Rs, us, a_final, b_final):
+    """
+    Verify the two-vector argument with a single multi-scalar multiplication.
+    """
+    with instrument.phase("verify"):
+        points, scalars_ = inner_product_terms(G_vec, H_vec, Q, Ls, Rs, us, a_final, b_final)
+        return is_inf(msm(points + [P], scalars_ + [-1]))
@@ -0,0 +1,119 @@
+from bulletproofs.curve import curve_order, RAW_INF, fixed_base_tables
+from bulletproofs.curve import raw_add, raw_double, raw_multiply, raw_is_inf, raw_normalize_batch, to_raw, from_raw
+from bulletproofs import glv
+from functools import reduce
+
+# Number of bits in a scalar modulo the curve order
+SCALAR_BITS = curve_order.bit_length()
+
+# Cost of one variable-base multiply (GLV, see curve.raw_multiply) in bucket
+# additions: its ~177 doublings and additions are on Jacobian points, about
+# 4/3 the cost of the mixed additions that fill the buckets
+MULTIPLY_COST = glv.multiply_cost(SCALAR_BITS) * 4 // 3
+
+def window_size(n):
+    """
+    Pick the Pippenger window width for an MSM of n terms.
+
+    With window width c there are ceil(SCALAR_BITS / c) windows, and each
+    window costs n bucket additions plus 2 * 2^c additions to sum the buckets.
+    We pick the c that minimizes that total.
+
+    Parameters:
+    - n: number of (point, scalar) pairs
+
+    Returns:
+    - c: window width in bits
+    """
+    def cost(c):
+        return -(-SCALAR_BITS // c) * (n + 2 ** (c + 1))
+    return min(range(1, 21), key=cost)
+
+def naive_msm(points, scalars):
+    """
+    Compute sum_i (scalars_i * points_i) with one scalar multiplication per term.
+    """
+    return from_raw(raw_naive_msm([to_raw(P) for P in points], scalars))
+
+def raw_naive_msm(points, scalars):
+    return reduce(raw_add, [raw_multiply(P, s) for P, s in zip(points, scalars)], RAW_INF)
+
+def msm(points, scalars):
+    """
+    Multi-scalar multiplication using the bucket method (Pippenger).
+
+    Given lists of points and scalars, compute:
+    result = sum_i (scalars_i * points_i)
+
+    Each scalar is split into windows of c bits. For every window, points are
+    dropped into one of 2^c - 1 buckets according to their window digit, and the
+    buckets are summed with a running sum so that bucket k is counted k times.
+    The windows are then combined with c doublings each, Horner style.
+
+    Parameters:
+    - points: list of elliptic curve points (G1 elements)
+    - scalars: list of scalars (integers, reduced modulo the curve order)
+
+    Returns:
+    - result: an elliptic curve point (Jacobian coordinates)
+    """
+    return from_raw(raw_msm([to_raw(P) for P in points], scalars))
+
+def raw_msm(points, scalars):
+    """
+    Same as msm, but on raw (X, Y, Z) int tuples as produced by curve.to_raw.
+    """
+    # Zero scalars and points at infinity contribute nothing
+    pairs = [(P, s % curve_order) for P, s in zip(points, scalars)]
+    pairs = [(P, s) for P, s in pairs if s != 0 and not raw_is_inf(P)]
+
+    # Terms whose base has a fixed-base table (see fixed_base.precompute) are
+    # cheaper through the table than through the buckets
+    fixed = RAW_INF
+    if fixed_base_tables:
+        variable = []
+        for P, s in pairs:
+            table = fixed_base_tables.get((P[0], P[1])) if P[2] == 1 else None
+            if table is None:
+                variable.append((P, s))
+            else:
+                fixed = raw_add(fixed, table.multiply(s))
+        pairs = variable
+
+    n = len(pairs)
+    if n == 0:
+        return fixed
+
+    c = window_size(n)
+    windows = -(-SCALAR_BITS // c)
+    # For a handful of terms, one GLV multiply per term is cheaper than
+    # filling and summing 2^c buckets per window
+    if n * MULTIPLY_COST <= windows * (n + 2 ** (c + 1)) + SCALAR_BITS:
+        return raw_add(fixed, raw_naive_msm(*zip(*pairs)))
+
+    # Every point is added once per window, so converting them all to affine
+    # form up front (one inversion in total) pays off through mixed additions
+    pairs = list(zip(raw_normalize_batch([P for P, _ in pairs]), [s for _, s in pairs]))
+
+    mask = (1 << c) - 1
+    result = RAW_INF
+    for w in reversed(range(windows)):
+        for _ in range(c):
+            result = raw_double(result)
+
+        shift = w * c
+        buckets = [RAW_INF] * mask
+        for P, s in pairs:
+            digit = (s >> shift) & mask
+            if digit:
+                buckets[digit - 1] = raw_add(buckets[digit - 1], P)
+
+        # running_sum after bucket k holds sum_{j >= k} bucket_j, so adding it to
+        # window_sum once per k counts bucket_j exactly j times
+        running_sum = RAW_INF
+        window_sum = RAW_INF
+        for bucket in reversed(buckets):
+            running_sum = raw_add(running_sum, bucket)
+            window_sum = raw_add(window_sum, running_sum)
+        result = raw_add(result, window_sum)
+    return raw_add(result, fixed)
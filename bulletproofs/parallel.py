@@ -0,0 +1,115 @@
+"""
+Parallel point work on a process pool.
+
+Pure-Python curve arithmetic holds the GIL, so threads do not help; these
+helpers split an MSM or a point fold into chunks and run them in a
+`concurrent.futures.ProcessPoolExecutor`. Points cross the process boundary
+as raw (X, Y, Z) int tuples rather than `FQ` objects, which keeps pickling
+cheap, and the partial results are merged in the parent.
+
+Usage:
+
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor() as executor:
+        C = parallel_msm(G_vec, a, executor)
+        proof = ipa.prove(G_vec, a, challenge, executor=executor)
+
+Work is split into one chunk per CPU (os.cpu_count()), which matches a
+ProcessPoolExecutor created with its default size. Inputs below MIN_CHUNK
+terms per chunk are computed in the calling process, where the overhead of
+shipping them would outweigh the gain.
+"""
+from bulletproofs.curve import curve_order as p
+from bulletproofs.curve import RAW_INF, raw_add, raw_multiply, to_raw, from_raw
+from bulletproofs.msm import raw_msm
+from bulletproofs.scalars import inverse
+from functools import reduce
+import os
+
+# Smallest number of terms worth sending to a worker
+MIN_CHUNK = 64
+
+def _chunks(n):
+    # Split range(n) into one contiguous slice per CPU, each at least MIN_CHUNK long
+    workers = os.cpu_count() or 1
+    count = max(1, min(workers, n // MIN_CHUNK))
+    size = max(1, -(-n // count))
+    return [slice(i, i + size) for i in range(0, n, size)]
+
+def _submit_msm(points, scalars, executor):
+    # Returns a list of futures (or plain results, for small inputs) of raw partial sums
+    raw_points = [to_raw(P) for P in points]
+    raw_scalars = [int(s) % p for s in scalars]
+    chunks = _chunks(len(raw_points))
+    if len(chunks) <= 1:
+        return [raw_msm(raw_points, raw_scalars)]
+    return [executor.submit(_msm_chunk, raw_points[c], raw_scalars[c]) for c in chunks]
+
+def _merge(partials):
+    return from_raw(reduce(raw_add, [f if isinstance(f, tuple) else f.result() for f in partials], RAW_INF))
+
+def _msm_chunk(points, scalars):
+    return raw_msm(points, scalars)
+
+def _fold_chunk(points, u, u_inv):
+    return [raw_add(raw_multiply(points[i], u), raw_multiply(points[i + 1], u_inv))
+            for i in range(0, len(points), 2)]
+
+def parallel_msm(points, scalars, executor):
+    """
+    Compute sum_i (scalars_i * points_i), splitting the work across a process pool.
+
+    Parameters:
+    - points: list of elliptic curve points
+    - scalars: list of scalars
+    - executor: a ProcessPoolExecutor
+
+    Returns:
+    - result: an elliptic curve point (Jacobian coordinates)
+    """
+    return _merge(_submit_msm(points, scalars, executor))
+
+def parallel_fold_points(point_vec, u, executor, u_inv=None):
+    """
+    Fold a point vector, G'_i = G_{2i} u + G_{2i+1} u^-1, across a process pool.
+
+    Parameters:
+    - point_vec: list of elliptic curve points; an unpaired last point is carried
+    - u: challenge scalar
+    - executor: a ProcessPoolExecutor
+    - u_inv: u^-1 modulo p, if the caller already has it
+
+    Returns:
+    - folded_vec: list of points (Jacobian coordinates)
+    """
+    raw_points = raw_parallel_fold_points([to_raw(P) for P in point_vec], u, executor, u_inv)
+    return [from_raw(P) for P in raw_points]
+
+def raw_parallel_fold_points(points, u, executor, u_inv=None):
+    """
+    parallel_fold_points on a list of raw points, returning raw points.
+    """
+    n = len(points)
+    if u_inv is None:
+        u_inv = inverse(u)
+    # An unpaired last point is carried over unchanged
+    carry = [points[-1]] if n % 2 else []
+    pairs = points[:n - n % 2]
+    # Chunk over pairs so that no pair is split between two workers
+    chunks = _chunks(n // 2)
+    if len(chunks) <= 1:
+        return _fold_chunk(pairs, u, u_inv) + carry
+    futures = [executor.submit(_fold_chunk, pairs[2 * c.start:2 * c.stop], u, u_inv)
+               for c in chunks]
+    return [P for f in futures for P in f.result()] + carry
+
+def parallel_compute_secondary_diagonal(G_vec, a, executor):
+    """
+    Compute L = sum_i a_{2i} G_{2i+1} and R = sum_i a_{2i+1} G_{2i} across a process pool.
+    """
+    assert len(G_vec) == len(a), "Unequal length of G_vec and a"
+    m = len(a) - len(a) % 2
+    # Submit both sums before waiting on either, so all workers stay busy
+    L_parts = _submit_msm(G_vec[1:m:2], a[0:m:2], executor)
+    R_parts = _submit_msm(G_vec[0:m:2], a[1:m:2], executor)
+    return (_merge(L_parts), _merge(R_parts))
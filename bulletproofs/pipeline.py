@@ -0,0 +1,199 @@
+"""
+Batch proving of many independent inner product statements.
+
+Every witness (a, b, gamma) is proven on its own with bulletproofs.aggregate
+(m = 1): the output is the commitment V = <a, b> g + gamma B and a proof that
+V commits to the inner product of a and b. Whole proofs are spread across a
+process pool, which is where pure-Python proving scales with cores:
+
+    python -m bulletproofs.pipeline witnesses.jsonl -o proofs.jsonl --workers 8
+
+Input is one JSON object per line, {"a": [...], "b": [...], "gamma": ...}
+with gamma optional (drawn at random if missing). Output is one JSON object
+per line, {"index": i, "n": n, "V": hex, "proof": hex}, in input order, with
+the proof in the aggregate.encode format. n is needed to verify (see
+verify_one): n need not be a power of two, so the number of rounds in the
+proof does not determine it. The throughput in proofs/s is reported
+on stderr. --random K proves K random witnesses instead of reading input.
+
+Each worker derives the generators and builds fixed-base tables for g, B and
+Q once, in its initializer, and reuses them for every proof it makes. The
+witnesses are read lazily, and at most max_pending proofs are in flight at
+any time: when that many are pending, the reader waits for the oldest one,
+which is also the next one to be written. This bounds memory, and keeps
+the output in order, however long the input is.
+"""
+from bulletproofs.curve import curve_order as p
+from bulletproofs.generators import derive_generators
+from bulletproofs.fixed_base import precompute
+from bulletproofs.serialize import encode_point, decode_point
+from bulletproofs.transcript import Transcript
+from bulletproofs import aggregate
+from collections import deque
+import argparse
+import json
+import os
+import random
+import secrets
+import sys
+import time
+
+DEFAULT_SEED = "RareSkills/pipeline"
+TRANSCRIPT_LABEL = b"bulletproofs pipeline"
+
+# Generators of the current process, set by init_worker
+_generators = None
+
+def make_generators(seed, n):
+    """
+    Derive the generators for vectors of up to n entries:
+    (G_vec, H_vec, g, B, Q).
+    """
+    G_vec = derive_generators(seed + "/G", n)
+    H_vec = derive_generators(seed + "/H", n)
+    g, B, Q = derive_generators(seed + "/gBQ", 3)
+    return (G_vec, H_vec, g, B, Q)
+
+def init_worker(seed, n):
+    """
+    Derive the generators once per process and build fixed-base tables for
+    g, B and Q, which every proof multiplies.
+    """
+    global _generators
+    _generators = make_generators(seed, n)
+    precompute(*_generators[2:])
+
+def prove_one(a, b, gamma=None):
+    """
+    Prove one witness with the generators of this process.
+
+    Returns:
+    - (V, proof): encoded commitment and encoded proof, as bytes
+    """
+    G_vec, H_vec, g, B, Q = _generators
+    n = len(a)
+    assert len(b) == n and 1 <= n <= len(G_vec), "a and b must have the same length, at most the generator count"
+    if gamma is None:
+        gamma = secrets.randbelow(p)
+    V = aggregate.commit_value(a, b, gamma, g, B)
+    proof = aggregate.prove([a], [b], [gamma], [V], G_vec[:n], H_vec[:n], g, B, Q, Transcript(TRANSCRIPT_LABEL))
+    return (encode_point(V), aggregate.encode(proof))
+
+def verify_one(record, generators):
+    """
+    Verify one output record {"n": n, "V": hex, "proof": hex}, as written
+    by the CLI, with generators from make_generators.
+    """
+    G_vec, H_vec, g, B, Q = generators
+    try:
+        n = int(record["n"])
+        V = decode_point(bytes.fromhex(record["V"]))
+        proof = aggregate.decode(bytes.fromhex(record["proof"]))
+    except (ValueError, KeyError, TypeError):
+        return False
+    if not 1 <= n <= len(G_vec):
+        return False
+    return aggregate.verify([V], proof, G_vec[:n], H_vec[:n], g, B, Q, Transcript(TRANSCRIPT_LABEL))
+
+def prove_stream(witnesses, executor=None, max_pending=None, workers=None):
+    """
+    Prove a stream of witnesses, yielding results in input order.
+
+    Parameters:
+    - witnesses: iterable of (a, b, gamma) with gamma possibly None
+    - executor: a ProcessPoolExecutor created with initializer=init_worker,
+      or None to prove in this process (after init_worker has been called)
+    - max_pending: most proofs in flight at once (default 4 per worker)
+    - workers: number of workers of the executor (default os.cpu_count())
+
+    Yields:
+    - (index, n, V, proof) with n the vector length and V and proof encoded
+      as bytes
+    """
+    if executor is None:
+        for index, (a, b, gamma) in enumerate(witnesses):
+            yield (index, len(a), *prove_one(a, b, gamma))
+        return
+    if max_pending is None:
+        max_pending = 4 * (workers or os.cpu_count() or 1)
+    pending = deque()
+    for index, (a, b, gamma) in enumerate(witnesses):
+        if len(pending) >= max_pending:
+            done_index, n, future = pending.popleft()
+            yield (done_index, n, *future.result())
+        pending.append((index, len(a), executor.submit(prove_one, a, b, gamma)))
+    while pending:
+        done_index, n, future = pending.popleft()
+        yield (done_index, n, *future.result())
+
+def read_witnesses(lines):
+    """
+    Parse JSON lines {"a": [...], "b": [...], "gamma": ...} lazily into
+    (a, b, gamma) tuples; blank lines are skipped.
+    """
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            a = [int(x) % p for x in record["a"]]
+            b = [int(x) % p for x in record["b"]]
+            gamma = record.get("gamma")
+            gamma = None if gamma is None else int(gamma) % p
+        except (ValueError, KeyError, TypeError) as e:
+            raise ValueError("line %d: not a witness (%s)" % (number, e))
+        if len(a) != len(b) or not a:
+            raise ValueError("line %d: a and b must be non-empty and the same length" % number)
+        yield (a, b, gamma)
+
+def random_witnesses(count, n, seed=0):
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield ([rng.randrange(p) for _ in range(n)], [rng.randrange(p) for _ in range(n)], rng.randrange(p))
+
+def main(argv=None):
+    from concurrent.futures import ProcessPoolExecutor
+    parser = argparse.ArgumentParser(description="Prove a stream of inner product witnesses in parallel.")
+    parser.add_argument("input", nargs="?", default="-", help="JSON lines of witnesses ('-' for stdin)")
+    parser.add_argument("-o", "--output", default="-", help="JSON lines of proofs ('-' for stdout)")
+    parser.add_argument("--n", type=int, default=64, help="largest vector length (number of generators)")
+    parser.add_argument("--seed", default=DEFAULT_SEED, help="generator seed")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--max-pending", type=int, help="proofs in flight at once (default 4 per worker)")
+    parser.add_argument("--random", type=int, metavar="K", help="prove K random witnesses of length n instead of reading input")
+    args = parser.parse_args(argv)
+
+    infile = None
+    if args.random is not None:
+        witnesses = random_witnesses(args.random, args.n)
+    else:
+        infile = sys.stdin if args.input == "-" else open(args.input)
+        witnesses = read_witnesses(infile)
+    out = sys.stdout if args.output == "-" else open(args.output, "w")
+    executor = None
+    if args.workers > 1:
+        executor = ProcessPoolExecutor(args.workers, initializer=init_worker, initargs=(args.seed, args.n))
+    else:
+        init_worker(args.seed, args.n)
+
+    count = 0
+    start = time.perf_counter()
+    try:
+        for index, n, V, proof in prove_stream(witnesses, executor, args.max_pending, args.workers):
+            out.write(json.dumps({"index": index, "n": n, "V": V.hex(), "proof": proof.hex()}) + "\n")
+            count += 1
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        if out is not sys.stdout:
+            out.close()
+        if infile not in (None, sys.stdin):
+            infile.close()
+    seconds = time.perf_counter() - start
+    print("%d proofs in %.2fs (%.2f proofs/s, %d worker%s)" % (
+        count, seconds, count / seconds if seconds else 0, args.workers, "" if args.workers == 1 else "s"),
+        file=sys.stderr)
+    return count
+
+if __name__ == "__main__":
+    main()
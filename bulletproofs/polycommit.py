@@ -0,0 +1,138 @@
+"""
+Polynomial commitments of any degree, opened at many points at once.
+
+Chapter 3 commits to f(x) = f_0 + f_1 x + f_2 x^2 as C_i = f_i G + gamma_i B
+and opens it at u with f(u) and pi = gamma_0 + gamma_1 u + gamma_2 u^2, which
+the verifier checks as
+
+    C_0 + C_1 u + C_2 u^2 == f(u) G + pi B
+
+Nothing in that depends on the degree being 2. Here f has d + 1 coefficients,
+f(u) and pi are computed with Horner's rule, and the check is one MSM of size
+d + 3:
+
+    Cs = commit(f, gammas, G, B)
+    y, pi = open_at(f, gammas, u)
+    assert verify(Cs, G, B, u, y, pi)
+
+Opening at k points x_1 .. x_k gives k claims (y_j, pi_j). Instead of k checks,
+the verifier draws random weights r_j and checks their sum:
+
+    sum_i (sum_j r_j x_j^i) C_i == (sum_j r_j y_j) G + (sum_j r_j pi_j) B
+
+The point work is still one MSM of size d + 3 whatever k is; only the scalar
+coefficients sum_j r_j x_j^i grow with k, at one multiplication per (i, j).
+A false claim passes only if the weights happen to cancel it, which has
+probability 1/p.
+
+    openings = open_many(f, gammas, xs)
+    assert verify_many(Cs, G, B, xs, openings)
+"""
+from bulletproofs.curve import curve_order as p
+from bulletproofs.curve import raw_add, raw_multiply, raw_is_inf, to_raw, from_raw
+from bulletproofs.msm import raw_msm
+from bulletproofs.batch import random_weight
+
+def commit(coeffs, blindings, G, B):
+    """
+    Commit to every coefficient: C_i = f_i G + gamma_i B.
+
+    G and B are the same for every coefficient, so with fixed-base tables
+    (fixed_base.precompute(G, B)) each commitment is two table lookups.
+
+    Parameters:
+    - coeffs: [f_0, f_1, ..., f_d]
+    - blindings: [gamma_0, gamma_1, ..., gamma_d]
+    - G, B: elliptic curve points with unknown discrete log relation
+
+    Returns:
+    - list of d + 1 commitments [C_0, ..., C_d]
+    """
+    assert len(coeffs) == len(blindings), "Need one blinding term per coefficient"
+    G, B = to_raw(G), to_raw(B)
+    return [from_raw(raw_add(raw_multiply(G, f % p), raw_multiply(B, gamma % p)))
+            for f, gamma in zip(coeffs, blindings)]
+
+def evaluate(coeffs, x):
+    """
+    Evaluate f(x) = f_0 + f_1 x + ... + f_d x^d modulo p with Horner's rule.
+    """
+    result = 0
+    for c in reversed(coeffs):
+        result = (result * x + c) % p
+    return result
+
+def open_at(coeffs, blindings, x):
+    """
+    Open the commitment at x.
+
+    Returns:
+    - (f(x), pi) with pi = gamma_0 + gamma_1 x + ... + gamma_d x^d
+    """
+    return (evaluate(coeffs, x), evaluate(blindings, x))
+
+def open_many(coeffs, blindings, xs):
+    """
+    Open the commitment at every point of xs; returns a list of (f(x), pi).
+    """
+    return [open_at(coeffs, blindings, x) for x in xs]
+
+def verify(Cs, G, B, x, y, pi):
+    """
+    Check one opening: sum_i C_i x^i == y G + pi B.
+    """
+    return verify_many(Cs, G, B, [x], [(y, pi)], weights=[1])
+
+def combined_scalars(d, xs, weights):
+    """
+    Coefficients of C_0 .. C_d in the weighted sum of the k opening checks:
+    s_i = sum_j r_j x_j^i, in O(k d) multiplications.
+    """
+    assert len(xs) == len(weights), "Need one weight per point"
+    terms = [r % p for r in weights]
+    out = []
+    for _ in range(d + 1):
+        out.append(sum(terms) % p)
+        terms = [(t * x) % p for t, x in zip(terms, xs)]
+    return out
+
+def equation(Cs, G, B, xs, openings, weights=None):
+    """
+    The k opening checks combined into one equation, as a list of
+    (point, scalar) pairs that must sum to zero (the format of
+    bulletproofs.batch, so openings of several polynomials can be
+    verified together with batch.batch_verify).
+
+    Parameters:
+    - Cs: commitments [C_0, ..., C_d]
+    - G, B: commitment bases
+    - xs: evaluation points x_1 .. x_k
+    - openings: list of (y_j, pi_j), one per point
+    - weights: r_1 .. r_k (fresh random weights if None)
+    """
+    assert len(xs) == len(openings), "Need one opening per point"
+    if weights is None:
+        weights = [random_weight() for _ in xs]
+    s = combined_scalars(len(Cs) - 1, xs, weights)
+    y = sum(r * y_j for r, (y_j, _) in zip(weights, openings)) % p
+    pi = sum(r * pi_j for r, (_, pi_j) in zip(weights, openings)) % p
+    return list(zip(Cs, s)) + [(G, -y % p), (B, -pi % p)]
+
+def verify_many(Cs, G, B, xs, openings, weights=None):
+    """
+    Check the openings of one committed polynomial at all points of xs with
+    a single MSM of size d + 3.
+
+    Parameters:
+    - Cs: commitments [C_0, ..., C_d]
+    - G, B: commitment bases
+    - xs: evaluation points
+    - openings: list of (f(x), pi), one per point, as returned by open_many
+    - weights: random weights, one per point (drawn here if None); only pass
+      them to make the check deterministic, never let the prover choose them
+
+    Returns:
+    - True if every opening is valid (up to probability 1/p)
+    """
+    terms = equation(Cs, G, B, xs, openings, weights)
+    return raw_is_inf(raw_msm([to_raw(P) for P, _ in terms], [s for _, s in terms]))
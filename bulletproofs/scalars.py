@@ -0,0 +1,120 @@
+"""
+Helpers for vectors of scalars modulo the curve order.
+"""
+from py_ecc.bn128 import curve_order as p
+from operator import mul
+from bulletproofs import field
+
+def batch_inverse(values, modulus=p):
+    """
+    Invert many field elements with a single modular inversion (Montgomery's trick).
+
+    With prefix products c_i = v_0 v_1 ... v_{i-1}, one inversion of the full
+    product gives every 1 / v_i = c_i / (v_0 ... v_i) after a backward pass,
+    for a total of 3 multiplications per element.
+
+    Parameters:
+    - values: list of nonzero integers
+    - modulus: prime modulus (the curve order by default)
+
+    Returns:
+    - inverses: list of 1 / v_i modulo the modulus
+    """
+    prefix = []
+    acc = 1
+    for v in values:
+        prefix.append(acc)
+        acc = acc * v % modulus
+    # Raises ValueError if any of the values is zero, like pow(v, -1, modulus)
+    inv = field.inverse(acc, modulus)
+    inverses = [0] * len(values)
+    for i in reversed(range(len(values))):
+        inverses[i] = inv * prefix[i] % modulus
+        inv = inv * values[i] % modulus
+    return inverses
+
+def inverse(value, modulus=p):
+    """
+    Return 1 / value modulo the modulus (the curve order by default) as an
+    int; raises ValueError if value is zero. Use this rather than pow(v, -1, p)
+    so the inversion goes through the field backend and is counted by
+    bulletproofs.instrument.
+    """
+    return int(field.inverse(value, modulus))
+
+# Whole-vector kernels. Python ints are already the fastest representation
+# for 254-bit values in CPython, so the speed comes from working on entire
+# vectors with zip/slices (no per-element indexing or appends) and from
+# reducing modulo p as late as possible.
+
+def inner_product(a, b):
+    """
+    Compute <a, b> modulo p, with a single reduction at the end.
+    """
+    return sum(map(mul, a, b)) % p
+
+def hadamard(a, b):
+    """
+    Compute the element-wise product a o b modulo p.
+    """
+    assert len(a) == len(b), "Vectors must be the same length"
+    return [x * y % p for x, y in zip(a, b)]
+
+def fold(scalar_vec, u, u_inv=None):
+    """
+    Fold a scalar vector in half: a'_i = a_{2i} u + a_{2i+1} u^-1 modulo p.
+
+    If the length is odd, the last element has no partner and is carried
+    into the folded vector unchanged.
+
+    Parameters:
+    - scalar_vec: list of scalars
+    - u: challenge scalar
+    - u_inv: u^-1 modulo p, if the caller already has it
+
+    Returns:
+    - folded_vec: list of ceil(len(scalar_vec) / 2) scalars
+    """
+    if u_inv is None:
+        u_inv = inverse(u)
+    folded = [(x * u + y * u_inv) % p for x, y in zip(scalar_vec[0::2], scalar_vec[1::2])]
+    if len(scalar_vec) % 2:
+        folded.append(scalar_vec[-1])
+    return folded
+
+def fold_in_place(scalar_vec, u, u_inv=None):
+    """
+    Fold a scalar vector like fold, but write the result into scalar_vec
+    itself and truncate it, instead of building a new list.
+
+    Element i of the result only depends on elements 2i and 2i + 1, which are
+    never overwritten before they are read.
+    """
+    if u_inv is None:
+        u_inv = inverse(u)
+    n = len(scalar_vec)
+    for i in range(n // 2):
+        scalar_vec[i] = (scalar_vec[2 * i] * u + scalar_vec[2 * i + 1] * u_inv) % p
+    if n % 2:
+        scalar_vec[n // 2] = scalar_vec[-1]
+    del scalar_vec[(n + 1) // 2:]
+
+def evaluate(coeff_vecs, u):
+    """
+    Evaluate a polynomial with vector coefficients, f(u) = f_0 + f_1 u + f_2 u^2 + ...
+
+    This is how l(u) = a + sL u and r(u) = b + sR u are computed. Horner's rule
+    is applied to whole vectors, so each element costs one multiplication, one
+    addition and one reduction per degree.
+
+    Parameters:
+    - coeff_vecs: list of coefficient vectors [f_0, f_1, ...], all the same length
+    - u: evaluation point
+
+    Returns:
+    - list of scalars f(u) modulo p
+    """
+    result = [x % p for x in coeff_vecs[-1]]
+    for coeffs in reversed(coeff_vecs[:-1]):
+        result = [(x * u + c) % p for x, c in zip(result, coeffs)]
+    return result
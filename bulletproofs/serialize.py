@@ -0,0 +1,160 @@
+"""
+Compact binary encodings for points, scalars and proofs.
+
+Points are 32 bytes: the big-endian affine x coordinate, with the two spare
+top bits (the field modulus is below 2^254) used as flags:
+
+    0x80 in the first byte: point at infinity (all other bits zero)
+    0x40 in the first byte: y is odd
+
+Decoding recovers y = sqrt(x^3 + 3), which is a single exponentiation because
+the field modulus is 3 mod 4.
+
+Scalars are 32 bytes big-endian and must be below the curve order.
+
+A proof is a length-prefixed container of a point vector followed by a scalar
+vector:
+
+    u32 number of points | points (32 bytes each) | u32 number of scalars | scalars (32 bytes each)
+
+The vector functions work on whole buffers: encoding normalizes all points
+with one inversion, and decoding slices a single memoryview without copying.
+Malformed input raises ValueError.
+"""
+from bulletproofs.curve import curve_order, field_modulus, b
+from bulletproofs.curve import RAW_INF, to_raw, from_raw, raw_normalize_batch
+
+POINT_SIZE = 32
+SCALAR_SIZE = 32
+
+q = field_modulus
+
+INFINITY_FLAG = 0x80
+PARITY_FLAG = 0x40
+
+def _encode_raw_affine(P):
+    x, y, z = P
+    if z == 0:
+        return bytes([INFINITY_FLAG]) + bytes(POINT_SIZE - 1)
+    data = bytearray(int(x).to_bytes(POINT_SIZE, 'big'))
+    if y & 1:
+        data[0] |= PARITY_FLAG
+    return bytes(data)
+
+def _decode_raw(buf):
+    flags = buf[0] & (INFINITY_FLAG | PARITY_FLAG)
+    x = int.from_bytes(buf, 'big') & ((1 << 254) - 1)
+    if flags & INFINITY_FLAG:
+        if flags != INFINITY_FLAG or x != 0:
+            raise ValueError("Invalid encoding of the point at infinity")
+        return RAW_INF
+    if x >= q:
+        raise ValueError("x coordinate is not a field element")
+    rhs = (x * x * x + b) % q
+    y = pow(rhs, (q + 1) // 4, q)
+    if y * y % q != rhs:
+        raise ValueError("x coordinate is not on the curve")
+    if (y & 1) != bool(flags & PARITY_FLAG):
+        y = q - y
+    return (x, y, 1)
+
+def encode_point(P):
+    """
+    Encode one point as 32 bytes.
+    """
+    return encode_points([P])
+
+def decode_point(data, raw=False):
+    """
+    Decode one 32-byte point. With raw=True, return a raw (x, y, 1) int tuple.
+    """
+    if len(data) != POINT_SIZE:
+        raise ValueError("A point encoding is exactly 32 bytes")
+    return decode_points(data, raw)[0]
+
+def encode_points(points):
+    """
+    Encode a list of points as consecutive 32-byte compressed points.
+
+    All points are converted to affine form with a single field inversion.
+    """
+    affine = raw_normalize_batch([to_raw(P) for P in points])
+    return b''.join(_encode_raw_affine(P) for P in affine)
+
+def decode_points(data, raw=False):
+    """
+    Decode consecutive 32-byte compressed points.
+
+    Parameters:
+    - data: bytes-like object whose length is a multiple of 32
+    - raw: if True, return raw (x, y, 1) int tuples instead of FQ points
+
+    Returns:
+    - list of points
+    """
+    view = memoryview(data)
+    if len(view) % POINT_SIZE:
+        raise ValueError("Point data length must be a multiple of 32")
+    points = [_decode_raw(view[i:i + POINT_SIZE]) for i in range(0, len(view), POINT_SIZE)]
+    return points if raw else [from_raw(P) for P in points]
+
+def encode_scalar(s):
+    """
+    Encode one scalar as 32 bytes.
+    """
+    return encode_scalars([s])
+
+def decode_scalar(data):
+    if len(data) != SCALAR_SIZE:
+        raise ValueError("A scalar encoding is exactly 32 bytes")
+    return decode_scalars(data)[0]
+
+def encode_scalars(scalars):
+    """
+    Encode a list of scalars (reduced modulo the curve order) as 32-byte big-endian integers.
+    """
+    return b''.join((int(s) % curve_order).to_bytes(SCALAR_SIZE, 'big') for s in scalars)
+
+def decode_scalars(data):
+    """
+    Decode consecutive 32-byte scalars, rejecting values not below the curve order.
+    """
+    view = memoryview(data)
+    if len(view) % SCALAR_SIZE:
+        raise ValueError("Scalar data length must be a multiple of 32")
+    scalars = [int.from_bytes(view[i:i + SCALAR_SIZE], 'big') for i in range(0, len(view), SCALAR_SIZE)]
+    if any(s >= curve_order for s in scalars):
+        raise ValueError("Scalar is not reduced modulo the curve order")
+    return scalars
+
+def encode_proof(points, scalars):
+    """
+    Encode a proof as a length-prefixed point vector followed by a length-prefixed scalar vector.
+
+    For example, the chapter 7 argument is encode_proof(Ls + Rs, [a_final]) and
+    the chapter 5 commitments are encode_proof([A, S, V, T1, T2], [...]).
+    """
+    return (len(points).to_bytes(4, 'big') + encode_points(points)
+            + len(scalars).to_bytes(4, 'big') + encode_scalars(scalars))
+
+def decode_proof(data, raw=False):
+    """
+    Decode a proof produced by encode_proof.
+
+    Returns:
+    - (points, scalars)
+    """
+    view = memoryview(data)
+    if len(view) < 4:
+        raise ValueError("Truncated proof")
+    n_points = int.from_bytes(view[:4], 'big')
+    end_points = 4 + n_points * POINT_SIZE
+    if len(view) < end_points + 4:
+        raise ValueError("Truncated proof")
+    n_scalars = int.from_bytes(view[end_points:end_points + 4], 'big')
+    end = end_points + 4 + n_scalars * SCALAR_SIZE
+    if len(view) != end:
+        raise ValueError("Proof length does not match its length prefixes")
+    points = decode_points(view[4:end_points], raw)
+    scalars = decode_scalars(view[end_points + 4:end])
+    return (points, scalars)
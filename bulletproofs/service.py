@@ -0,0 +1,402 @@
+"""
+Asyncio verifier service and prover client for the interactive folding
+argument of chapter 7.
+
+The verifier of chapter 7a is inlined in the script and talks to a single
+prover. Here it runs as a service: one event loop serves any number of
+concurrent sessions, each prover connection can multiplex many sessions, and
+the final check (one MSM per session) runs in an executor so the event loop
+only ever moves bytes and draws challenges.
+
+Every message is a frame
+
+    length u32 | session id u32 | type u8 | payload
+
+where length counts everything after itself. A session is:
+
+    prover                                   verifier
+    HELLO      n u32 | P                 ->
+    ROUND      L | R                     ->            (ceil(log2 n) times)
+                                         <-  CHALLENGE  u
+    FINAL      a''                       ->
+                                         <-  RESULT     1 (accepted) or 0
+
+Points are 32-byte compressed and scalars 32 bytes (bulletproofs.serialize).
+A malformed or out-of-order message gets an ERROR reply with a text payload
+and closes that session only. A connection may have at most max_sessions
+sessions open or being checked at once; a HELLO beyond that gets an ERROR.
+
+The verifier keeps one small __slots__ object per open session, holding the
+messages as received (bytes) and the challenges; points are only decoded, in
+the executor, when the session is checked. The checks are pure-Python MSMs,
+which hold the GIL, so they run in a process pool: every worker receives
+the generators once, from its initializer (init_worker), and each check
+only ships n and the message bytes.
+
+    server = VerifierServer(G_vec)         # starts its own process pool
+    await asyncio.start_server(server.handle, "127.0.0.1", 9000)   # or start_unix_server
+    ...
+    server.close()
+
+    client = await ProverClient.connect("127.0.0.1", 9000)
+    accepted = await client.prove(G_vec[:n], a)
+
+loopback() runs both ends in one process, which is how the service is tested:
+
+    python -m bulletproofs.service --sessions 1000 --log-n 2
+"""
+from bulletproofs.curve import curve_order as p
+from bulletproofs.curve import to_raw
+from bulletproofs.msm import raw_msm
+from bulletproofs.serialize import encode_points, decode_points, encode_scalar, decode_scalar, POINT_SIZE, SCALAR_SIZE
+from bulletproofs.batch import random_weight
+from bulletproofs import ipa, scalars
+import argparse
+import asyncio
+import itertools
+import struct
+import time
+
+HELLO, ROUND, FINAL, CHALLENGE, RESULT, ERROR = range(1, 7)
+
+# Most sessions one connection may have open or being checked at once
+MAX_SESSIONS = 256
+
+FRAME = struct.Struct(">IIB")
+# Largest frame accepted; the largest message is a 64-byte ROUND
+MAX_FRAME = 1 << 12
+
+async def read_frame(reader):
+    """
+    Read one frame and return (session id, type, payload).
+
+    Raises asyncio.IncompleteReadError at end of stream and ValueError on a
+    bad length.
+    """
+    length, session, kind = FRAME.unpack(await reader.readexactly(FRAME.size))
+    if not FRAME.size - 4 <= length <= MAX_FRAME:
+        raise ValueError("Bad frame length")
+    return session, kind, await reader.readexactly(length - (FRAME.size - 4))
+
+def write_frame(writer, session, kind, payload=b""):
+    writer.write(FRAME.pack(FRAME.size - 4 + len(payload), session, kind) + payload)
+
+class _Session:
+    # Verifier state of one open session
+    __slots__ = ("n", "rounds", "P", "LR", "us")
+
+    def __init__(self, n, P):
+        self.n = n
+        self.rounds = ipa.num_rounds(n)
+        self.P = P
+        self.LR = []
+        self.us = []
+
+# Generators of the current process, set by init_worker
+_G_vec = None
+
+def init_worker(G_vec):
+    """
+    Store the generators (as raw points) in this process, for _check. Use as
+    the initializer of the verifier's executor.
+    """
+    global _G_vec
+    _G_vec = [to_raw(G) for G in G_vec]
+
+def make_executor(G_vec, workers=None):
+    """
+    Create a process pool whose workers hold G_vec, for VerifierServer.
+
+    The workers are started lazily, once connections are open, so they are
+    not forked from this process: a forked worker would inherit the open
+    sockets and keep them from closing. As with any non-fork pool, a script
+    that uses it must guard its entry point with if __name__ == "__main__".
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    import multiprocessing
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return ProcessPoolExecutor(workers, multiprocessing.get_context(method),
+                               initializer=init_worker, initargs=([to_raw(G) for G in G_vec],))
+
+def _check(n, P, LR, us, a_final):
+    # Runs in the executor: decode the messages and do the single-MSM check
+    # against the first n generators of the worker
+    try:
+        P = decode_points(P, raw=True)[0]
+        points = decode_points(b"".join(LR), raw=True)
+    except ValueError:
+        return False
+    return ipa.verify(_G_vec[:n], P, points[0::2], points[1::2], us, a_final)
+
+class VerifierServer:
+    """
+    Verifier side of the service. Pass `handle` to asyncio.start_server or
+    asyncio.start_unix_server, and call close() when done.
+
+    Parameters:
+    - G_vec: generators; a session of length n uses the first n
+    - executor: executor for the final checks, whose workers must have run
+      init_worker(G_vec) (see make_executor); None to start a process pool
+      of os.cpu_count() workers, which close() shuts down
+    - max_sessions: most sessions per connection open or being checked
+    """
+    def __init__(self, G_vec, executor=None, max_sessions=MAX_SESSIONS):
+        self.n_max = len(G_vec)
+        self._own_executor = executor is None
+        self.executor = make_executor(G_vec) if executor is None else executor
+        self.max_sessions = max_sessions
+        self._handlers = set()
+        self.open_sessions = 0
+        self.accepted = 0
+        self.rejected = 0
+
+    def close(self):
+        """
+        Shut down the process pool, if the server started it.
+        """
+        if self._own_executor:
+            self.executor.shutdown()
+
+    async def wait_closed(self):
+        """
+        Wait until every connection handled so far has been closed.
+        """
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+
+    async def handle(self, reader, writer):
+        sessions = {}
+        checks = set()
+        task = asyncio.current_task()
+        self._handlers.add(task)
+        task.add_done_callback(self._handlers.discard)
+        try:
+            while True:
+                try:
+                    session, kind, payload = await read_frame(reader)
+                except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+                    break
+                try:
+                    self._receive(writer, sessions, checks, session, kind, payload)
+                except ValueError as e:
+                    if sessions.pop(session, None) is not None:
+                        self.open_sessions -= 1
+                    write_frame(writer, session, ERROR, str(e).encode())
+                await writer.drain()
+            if checks:
+                await asyncio.gather(*checks, return_exceptions=True)
+        finally:
+            self.open_sessions -= len(sessions)
+            writer.close()
+
+    def _receive(self, writer, sessions, checks, session, kind, payload):
+        state = sessions.get(session)
+        if kind == HELLO:
+            if state is not None:
+                raise ValueError("Session already open")
+            if len(sessions) + len(checks) >= self.max_sessions:
+                raise ValueError("Too many open sessions")
+            if len(payload) != 4 + POINT_SIZE:
+                raise ValueError("HELLO is n and P")
+            n = int.from_bytes(payload[:4], 'big')
+            if not 1 <= n <= self.n_max:
+                raise ValueError("Unsupported vector length")
+            sessions[session] = _Session(n, payload[4:])
+            self.open_sessions += 1
+        elif state is None:
+            raise ValueError("No such session")
+        elif kind == ROUND:
+            if len(state.us) == state.rounds:
+                raise ValueError("Too many rounds")
+            if len(payload) != 2 * POINT_SIZE:
+                raise ValueError("ROUND is L and R")
+            u = random_weight()
+            state.LR.append(payload)
+            state.us.append(u)
+            write_frame(writer, session, CHALLENGE, encode_scalar(u))
+        elif kind == FINAL:
+            if len(state.us) != state.rounds:
+                raise ValueError("FINAL before the last round")
+            if len(payload) != SCALAR_SIZE:
+                raise ValueError("FINAL is one scalar")
+            a_final = decode_scalar(payload)
+            del sessions[session]
+            self.open_sessions -= 1
+            task = asyncio.ensure_future(self._finish(writer, session, state, a_final))
+            checks.add(task)
+            task.add_done_callback(checks.discard)
+        else:
+            raise ValueError("Unexpected message type")
+
+    async def _finish(self, writer, session, state, a_final):
+        loop = asyncio.get_running_loop()
+        try:
+            ok = await loop.run_in_executor(
+                self.executor, _check, state.n, state.P, state.LR, state.us, a_final)
+        except Exception as e:
+            # e.g. a broken process pool: the session gets an answer either way
+            frame = (ERROR, ("Check failed: %s" % type(e).__name__).encode())
+        else:
+            if ok:
+                self.accepted += 1
+            else:
+                self.rejected += 1
+            frame = (RESULT, bytes([ok]))
+        if not writer.is_closing():
+            write_frame(writer, session, *frame)
+            try:
+                await writer.drain()
+            except ConnectionError:
+                pass
+
+def _round(G_vec, a):
+    # Prover work for one round, run in the executor
+    L, R = ipa.raw_compute_secondary_diagonal(G_vec, a)
+    return encode_points([L, R])
+
+def _fold(G_vec, a, u):
+    # Fold with the challenge, run in the executor; returns new lists so that
+    # it also works in a process pool
+    u_inv = scalars.inverse(u)
+    a = list(a)
+    G_vec = list(G_vec)
+    scalars.fold_in_place(a, u, u_inv)
+    ipa.raw_fold_points_in_place(G_vec, u_inv, u)
+    return G_vec, a
+
+class ProverClient:
+    """
+    Prover side of the service. One client connection carries any number of
+    concurrent sessions, one per prove() call.
+
+    Parameters:
+    - reader, writer: an open stream pair (see connect)
+    - executor: executor for the per-round point work (None for the loop's
+      default thread pool)
+    - max_sessions: most sessions run at once; further prove() calls wait,
+      so as not to exceed the verifier's limit per connection
+    """
+    def __init__(self, reader, writer, executor=None, max_sessions=MAX_SESSIONS):
+        self.reader = reader
+        self.writer = writer
+        self.executor = executor
+        self._slots = asyncio.Semaphore(max_sessions)
+        self._ids = itertools.count(1)
+        self._queues = {}
+        self._reader_task = asyncio.ensure_future(self._dispatch())
+
+    @classmethod
+    async def connect(cls, host="127.0.0.1", port=None, path=None, executor=None):
+        """
+        Connect over TCP, or over a Unix socket if `path` is given.
+        """
+        if path is not None:
+            reader, writer = await asyncio.open_unix_connection(path)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer, executor)
+
+    async def _dispatch(self):
+        # Route every incoming frame to the queue of its session
+        try:
+            while True:
+                session, kind, payload = await read_frame(self.reader)
+                queue = self._queues.get(session)
+                if queue is not None:
+                    queue.put_nowait((kind, payload))
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        for queue in self._queues.values():
+            queue.put_nowait((ERROR, b"Connection closed"))
+
+    async def _expect(self, queue, expected):
+        kind, payload = await queue.get()
+        if kind == ERROR:
+            raise ValueError(payload.decode(errors="replace"))
+        if kind != expected:
+            raise ValueError("Unexpected message type")
+        return payload
+
+    async def prove(self, G_vec, a, P=None):
+        """
+        Run one session proving knowledge of a with P = <a, G_vec>.
+
+        Returns:
+        - True if the verifier accepted
+        """
+        assert len(G_vec) == len(a), "Unequal length of G_vec and a"
+        loop = asyncio.get_running_loop()
+        G_vec = [to_raw(G) for G in G_vec]
+        a = [x % p for x in a]
+        if P is None:
+            P = await loop.run_in_executor(self.executor, raw_msm, G_vec, a)
+        async with self._slots:
+            return await self._prove(G_vec, a, P, loop)
+
+    async def _prove(self, G_vec, a, P, loop):
+        session = next(self._ids)
+        queue = self._queues[session] = asyncio.Queue()
+        try:
+            write_frame(self.writer, session, HELLO, len(a).to_bytes(4, 'big') + encode_points([P]))
+            while len(a) > 1:
+                LR = await loop.run_in_executor(self.executor, _round, G_vec, a)
+                write_frame(self.writer, session, ROUND, LR)
+                await self.writer.drain()
+                u = decode_scalar(await self._expect(queue, CHALLENGE))
+                G_vec, a = await loop.run_in_executor(self.executor, _fold, G_vec, a, u)
+            write_frame(self.writer, session, FINAL, encode_scalar(a[0]))
+            await self.writer.drain()
+            return await self._expect(queue, RESULT) == b"\x01"
+        finally:
+            del self._queues[session]
+
+    async def close(self):
+        self.writer.close()
+        await self._reader_task
+
+async def loopback(G_vec, instances, executor=None):
+    """
+    Start a verifier on an ephemeral local port, run one session per vector in
+    `instances` concurrently over a single client connection, and return
+    (results, server).
+
+    The verifier checks sessions in `executor` (see make_executor), or in a
+    process pool of its own if None; the prover uses the default thread pool.
+    """
+    server = VerifierServer(G_vec, executor)
+    try:
+        listener = await asyncio.start_server(server.handle, "127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        async with listener:
+            client = await ProverClient.connect("127.0.0.1", port)
+            try:
+                results = await asyncio.gather(*(client.prove(G_vec[:len(a)], a) for a in instances))
+            finally:
+                await client.close()
+            await server.wait_closed()
+    finally:
+        server.close()
+    return results, server
+
+def main(argv=None):
+    import random
+    from bulletproofs.generators import derive_generators
+    parser = argparse.ArgumentParser(description="Run many concurrent sessions against an in-process verifier.")
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--log-n", type=int, default=2, help="vector length is 2^log_n")
+    parser.add_argument("--workers", type=int, help="verifier processes (default os.cpu_count())")
+    args = parser.parse_args(argv)
+
+    n = 2 ** args.log_n
+    G_vec = derive_generators("RareSkills/G", n)
+    rng = random.Random(0)
+    instances = [[rng.randrange(p) for _ in range(n)] for _ in range(args.sessions)]
+    start = time.perf_counter()
+    with make_executor(G_vec, args.workers) as executor:
+        results, server = asyncio.run(loopback(G_vec, instances, executor))
+    seconds = time.perf_counter() - start
+    print("%d sessions, n=%d: %d accepted, %d rejected in %.2fs (%.1f sessions/s)" % (
+        len(results), n, server.accepted, server.rejected, seconds, len(results) / seconds))
+    return results
+
+if __name__ == "__main__":
+    main()
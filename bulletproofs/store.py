@@ -0,0 +1,155 @@
+"""
+On-disk generator files, opened with mmap so any slice can be read lazily.
+
+Build a file once (one per vector, e.g. G and H, with different seeds):
+
+    python -m bulletproofs.store G.bin --seed RareSkills/G --count 65536 --workers 8
+
+and open it in the prover:
+
+    with GeneratorStore("G.bin") as G_vec:
+        G_chunk = G_vec[1024:2048]     # only these 1024 records are read
+
+File layout (all integers big-endian):
+
+    header   magic "BPGENS01" | version u32 | record size u32 | curve name 16s |
+             count u64 | seed length u32 | seed 64s | sha256 of all records 32s
+    records  count x (x coordinate 32 bytes | y coordinate 32 bytes)
+
+Points are derived with bulletproofs.generators, so record i is
+derive_generator(seed, i). The checksum is checked on demand with
+verify_checksum() (or open with verify=True), since it needs a full scan.
+"""
+from bulletproofs.curve import FQ
+from bulletproofs.generators import derive_generators
+from hashlib import sha256
+import argparse
+import mmap
+import struct
+
+MAGIC = b"BPGENS01"
+VERSION = 1
+CURVE = b"bn128"
+RECORD_SIZE = 64
+MAX_SEED = 64
+
+HEADER = struct.Struct(">8sII16sQI64s32s")
+
+def write_store(path, seed, count, executor=None, chunk_size=4096):
+    """
+    Derive `count` generators for `seed` and write them to a generator file.
+
+    Parameters:
+    - path: output file
+    - seed: str or bytes, at most 64 bytes
+    - count: number of generators
+    - executor: optional executor used to derive each chunk in parallel
+    - chunk_size: number of generators derived and written at a time
+    """
+    seed = seed.encode('ascii') if isinstance(seed, str) else bytes(seed)
+    assert len(seed) <= MAX_SEED, "seed must be at most 64 bytes"
+    checksum = sha256()
+    with open(path, "wb") as f:
+        # Header is rewritten with the checksum once all records are known
+        f.write(bytes(HEADER.size))
+        for start in range(0, count, chunk_size):
+            stop = min(start + chunk_size, count)
+            points = derive_generators(seed, start, stop, executor=executor, raw=True)
+            data = b''.join(x.to_bytes(32, 'big') + y.to_bytes(32, 'big') for x, y in points)
+            checksum.update(data)
+            f.write(data)
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, RECORD_SIZE, CURVE, count, len(seed), seed, checksum.digest()))
+
+class GeneratorStore:
+    """
+    Read-only, memory-mapped view of a generator file.
+
+    Indexing returns affine (FQ(x), FQ(y)) points; slicing returns a list and
+    only touches the pages of the requested records. Use `raw` to get
+    (x, y, 1) int tuples without creating FQ objects.
+    """
+    def __init__(self, path, verify=False):
+        self._file = open(path, "rb")
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError("Generator file is empty")
+        self._view = memoryview(self._mmap)
+        if len(self._view) < HEADER.size:
+            self.close()
+            raise ValueError("Generator file is truncated")
+        magic, version, record_size, curve, count, seed_len, seed, checksum = HEADER.unpack(self._view[:HEADER.size])
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError("Not a generator file, or unsupported version")
+        if curve.rstrip(b"\0") != CURVE or record_size != RECORD_SIZE:
+            self.close()
+            raise ValueError("Generator file is for a different curve")
+        if len(self._view) != HEADER.size + count * RECORD_SIZE:
+            self.close()
+            raise ValueError("Generator file size does not match its header")
+        self.count = count
+        self.seed = bytes(seed[:seed_len])
+        self.checksum = checksum
+        if verify and not self.verify_checksum():
+            self.close()
+            raise ValueError("Generator file checksum mismatch")
+
+    def __len__(self):
+        return self.count
+
+    def _record(self, i):
+        offset = HEADER.size + i * RECORD_SIZE
+        return (int.from_bytes(self._view[offset:offset + 32], 'big'),
+                int.from_bytes(self._view[offset + 32:offset + 64], 'big'))
+
+    def raw(self, start, stop):
+        """
+        Return generators start .. stop - 1 as raw (x, y, 1) int tuples.
+        """
+        start, stop, _ = slice(start, stop).indices(self.count)
+        return [(*self._record(i), 1) for i in range(start, stop)]
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [(FQ(x), FQ(y)) for x, y in map(self._record, range(*key.indices(self.count)))]
+        if key < 0:
+            key += self.count
+        if not 0 <= key < self.count:
+            raise IndexError("generator index out of range")
+        x, y = self._record(key)
+        return (FQ(x), FQ(y))
+
+    def verify_checksum(self):
+        return sha256(self._view[HEADER.size:]).digest() == self.checksum
+
+    def close(self):
+        self._view.release()
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+def main(argv=None):
+    from concurrent.futures import ProcessPoolExecutor
+    parser = argparse.ArgumentParser(description="Write a memory-mappable generator file.")
+    parser.add_argument("path")
+    parser.add_argument("--seed", required=True)
+    parser.add_argument("--count", type=int, required=True)
+    parser.add_argument("--workers", type=int, default=1, help="processes used to derive the points")
+    args = parser.parse_args(argv)
+    if args.workers > 1:
+        with ProcessPoolExecutor(args.workers) as executor:
+            write_store(args.path, args.seed, args.count, executor)
+    else:
+        write_store(args.path, args.seed, args.count)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""
+Memory-bounded prover for the chapter 7 folding argument at large n.
+
+ipa.prove keeps the whole of G_vec as Jacobian FQ points and builds a new list
+for every folded a' and G', so at n = 2^20 several copies of a million points
+are alive at once. This prover produces the same proof as
+ipa.prove_noninteractive, but:
+
+-   the generators are read chunk by chunk from a generator source (an object
+    with `raw(start, stop)`, such as bulletproofs.store.GeneratorStore, or
+    DerivedGenerators below), and never held in full;
+-   the first round computes L and R, and then G', in two passes over the
+    source, so only the ceil(n/2) folded generators are ever stored;
+-   every later round folds a and G' in place, writing pair i to index i, and
+    truncates the lists, so each round's input is freed as it is consumed;
+-   the folded generators are kept as raw affine (x, y, 1) int tuples,
+    normalized one chunk at a time with a single inversion.
+
+Peak memory is therefore about n scalars plus n/2 affine points, instead of
+several copies of n FQ points.
+
+As in ipa.prove, n does not have to be a power of two: when a round starts
+with an odd length, the last a_i and G_i are left out of L and R and carried
+into the next round unchanged. Run
+
+    python -m bulletproofs.stream --log-n 20 --store G.bin
+
+to prove and verify a random instance and report the time of each phase with
+the process's maximum resident size (--n sets a length that is not a power
+of two). --trace-memory reports the tracemalloc peak of each phase instead,
+which is exact but slows the run down many times; --baseline also runs
+ipa.prove_noninteractive for comparison.
+"""
+from bulletproofs.curve import curve_order as p
+from bulletproofs.curve import RAW_INF, raw_add, raw_multiply, raw_is_inf, raw_normalize_batch, to_raw, from_raw
+from bulletproofs.msm import raw_msm
+from bulletproofs.scalars import batch_inverse, fold_in_place, inverse
+from bulletproofs.generators import derive_generators
+from bulletproofs import ipa, instrument
+import argparse
+import random
+import resource
+import time
+import tracemalloc
+
+# Number of generators read from the source, and folded, at a time
+DEFAULT_CHUNK = 1 << 14
+
+class DerivedGenerators:
+    """
+    Generator source that derives points on demand with bulletproofs.generators.
+
+    Parameters:
+    - seed: str or bytes
+    - count: number of generators
+    """
+    def __init__(self, seed, count):
+        self.seed = seed
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def raw(self, start, stop):
+        return [(x, y, 1) for x, y in derive_generators(self.seed, start, stop, raw=True)]
+
+def _read(source, start, stop):
+    # Generator sources have raw(); a plain list of points is accepted too
+    if hasattr(source, "raw"):
+        return source.raw(start, stop)
+    return [to_raw(P) for P in source[start:stop]]
+
+def _fold_into(buf, points, offset, u, u_inv):
+    # Write the folded pairs of `points` to buf[offset:], normalized to affine;
+    # an unpaired last point (only in the last chunk) is carried unchanged
+    m = len(points) - len(points) % 2
+    folded = [raw_add(raw_multiply(points[i], u), raw_multiply(points[i + 1], u_inv))
+              for i in range(0, m, 2)]
+    if m < len(points):
+        folded.append(points[-1])
+    buf[offset:offset + len(folded)] = raw_normalize_batch(folded)
+
+def _diagonal(G_vec, a, start, stop):
+    # An unpaired last element is left out
+    stop -= (stop - start) % 2
+    L = raw_msm(G_vec[start + 1:stop:2], a[start:stop:2])
+    R = raw_msm(G_vec[start:stop:2], a[start + 1:stop:2])
+    return (L, R)
+
+def commit(source, a, chunk_size=DEFAULT_CHUNK):
+    """
+    Compute P = <a, G> reading the generators chunk by chunk.
+
+    Returns:
+    - P: an elliptic curve point (Jacobian coordinates)
+    """
+    P = RAW_INF
+    for start in range(0, len(a), chunk_size):
+        stop = min(start + chunk_size, len(a))
+        P = raw_add(P, raw_msm(_read(source, start, stop), a[start:stop]))
+    return from_raw(P)
+
+def prove(source, a, P, transcript, chunk_size=DEFAULT_CHUNK):
+    """
+    Produce the proof of ipa.prove_noninteractive with bounded memory.
+
+    Parameters:
+    - source: generator source with raw(start, stop), or a list of points
+    - a: list of scalars, of any length; it is folded in place, so pass a
+      copy if it is still needed
+    - P: the commitment <a, G>
+    - transcript: a bulletproofs.transcript.Transcript
+    - chunk_size: number of generators read and folded at a time (even)
+
+    Returns:
+    - (Ls, Rs, a_final)
+    """
+    n = len(a)
+    assert n > 0, "a must not be empty"
+    assert chunk_size % 2 == 0, "chunk_size must be even so that no pair is split"
+    challenge = ipa.transcript_challenges(transcript)
+    ipa._start_transcript(transcript, n, P)
+    Ls, Rs = [], []
+    if n == 1:
+        return (Ls, Rs, a[0] % p)
+
+    # Round 1 works straight from the source: one pass for L and R, and after
+    # the challenge a second pass that folds into the ceil(n/2) buffer
+    with instrument.phase("round", 1):
+        L, R = RAW_INF, RAW_INF
+        for start in range(0, n, chunk_size):
+            stop = min(start + chunk_size, n)
+            L_part, R_part = _diagonal(_read(source, start, stop), a[start:stop], 0, stop - start)
+            L, R = raw_add(L, L_part), raw_add(R, R_part)
+        L, R = from_raw(L), from_raw(R)
+        u = challenge(L, R)
+        u_inv = inverse(u)
+        G_vec = [None] * ((n + 1) // 2)
+        for start in range(0, n, chunk_size):
+            stop = min(start + chunk_size, n)
+            _fold_into(G_vec, _read(source, start, stop), start // 2, u_inv, u)
+        fold_in_place(a, u, u_inv)
+    Ls.append(L)
+    Rs.append(R)
+
+    # Later rounds fold the buffers in place; pair i only ever overwrites
+    # indices at or below 2i, which have already been read, and a carried
+    # last point moves from n - 1 to n // 2
+    while len(a) > 1:
+        with instrument.phase("round", len(Ls) + 1):
+            n = len(a)
+            L, R = RAW_INF, RAW_INF
+            for start in range(0, n, chunk_size):
+                L_part, R_part = _diagonal(G_vec, a, start, min(start + chunk_size, n))
+                L, R = raw_add(L, L_part), raw_add(R, R_part)
+            L, R = from_raw(L), from_raw(R)
+            u = challenge(L, R)
+            u_inv = inverse(u)
+            for start in range(0, n, chunk_size):
+                stop = min(start + chunk_size, n)
+                _fold_into(G_vec, G_vec[start:stop], start // 2, u_inv, u)
+            del G_vec[(n + 1) // 2:]
+            fold_in_place(a, u, u_inv)
+        Ls.append(L)
+        Rs.append(R)
+    return (Ls, Rs, a[0])
+
+def verify(source, P, Ls, Rs, a_final, transcript, chunk_size=DEFAULT_CHUNK, n=None):
+    """
+    Verify a proof like ipa.verify_noninteractive, reading the first n
+    generators chunk by chunk. The single-MSM check is split into one MSM
+    per chunk of generators, plus one for the L, R and P terms.
+
+    n is the length of the committed vector (all of the source by default);
+    it is not implied by the proof, since ceil(log2 n) rounds cover many n.
+    """
+    if n is None:
+        n = len(source)
+    if len(Ls) != len(Rs) or ipa.num_rounds(n) != len(Ls) or not 1 <= n <= len(source):
+        return False
+    ipa._start_transcript(transcript, n, P)
+    challenge = ipa.transcript_challenges(transcript)
+    us = [challenge(L, R) for L, R in zip(Ls, Rs)]
+    with instrument.phase("verify"):
+        u_invs = batch_inverse(us)
+        s = ipa.challenge_scalars(us, u_invs, n)
+        total = raw_msm(
+            [to_raw(X) for X in Ls + [P] + Rs],
+            [-u * u % p for u in us] + [p - 1] + [-u_inv * u_inv % p for u_inv in u_invs])
+        for start in range(0, n, chunk_size):
+            stop = min(start + chunk_size, n)
+            total = raw_add(total, raw_msm(_read(source, start, stop), [a_final * x % p for x in s[start:stop]]))
+        return raw_is_inf(total)
+
+def _measure(f, args, trace):
+    # Returns (result, seconds, peak bytes) of one call: the traced peak of the
+    # call with tracemalloc, otherwise the process's maximum resident size so far
+    if trace:
+        tracemalloc.reset_peak()
+    start = time.perf_counter()
+    result = f(*args)
+    seconds = time.perf_counter() - start
+    if trace:
+        return result, seconds, tracemalloc.get_traced_memory()[1]
+    return result, seconds, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def main(argv=None):
+    from bulletproofs.transcript import Transcript
+    from bulletproofs.store import GeneratorStore
+    parser = argparse.ArgumentParser(description="Prove and verify one random instance with the streaming prover.")
+    parser.add_argument("--log-n", type=int, default=12, help="vector length is 2^log_n")
+    parser.add_argument("--n", type=int, help="vector length, any positive value (overrides --log-n)")
+    parser.add_argument("--store", metavar="PATH", help="generator file from bulletproofs.store (default: derive on demand)")
+    parser.add_argument("--seed", default="RareSkills/G", help="generator seed when no store is given")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK)
+    parser.add_argument("--baseline", action="store_true", help="also run ipa.prove_noninteractive on in-memory lists")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="report the tracemalloc peak of each phase (much slower) instead of the process's max RSS")
+    args = parser.parse_args(argv)
+
+    n = args.n if args.n is not None else 2 ** args.log_n
+    source = GeneratorStore(args.store) if args.store else DerivedGenerators(args.seed, n)
+    assert len(source) >= n, "Generator source has fewer than n points"
+    rng = random.Random(0)
+    a = [rng.randrange(p) for _ in range(n)]
+    kind = "traced peak" if args.trace_memory else "max RSS"
+
+    if args.trace_memory:
+        tracemalloc.start()
+    try:
+        P, t, peak = _measure(commit, (source, a, args.chunk_size), args.trace_memory)
+        print("commit   %10.2fs  %s %8.1f MiB" % (t, kind, peak / 2**20))
+        (Ls, Rs, a_final), t, peak = _measure(
+            prove, (source, list(a), P, Transcript(b"stream"), args.chunk_size), args.trace_memory)
+        print("prove    %10.2fs  %s %8.1f MiB" % (t, kind, peak / 2**20))
+        ok, t, peak = _measure(
+            verify, (source, P, Ls, Rs, a_final, Transcript(b"stream"), args.chunk_size, n), args.trace_memory)
+        print("verify   %10.2fs  %s %8.1f MiB  %s" % (t, kind, peak / 2**20, "accepted" if ok else "REJECTED"))
+        if args.baseline:
+            def baseline():
+                G_vec = [from_raw(G) for G in _read(source, 0, n)]
+                return ipa.prove_noninteractive(G_vec, list(a), P, Transcript(b"stream"))
+            _, t, peak = _measure(baseline, (), args.trace_memory)
+            print("baseline %10.2fs  %s %8.1f MiB  (ipa.prove_noninteractive, G_vec in memory)" % (t, kind, peak / 2**20))
+    finally:
+        if args.trace_memory:
+            tracemalloc.stop()
+        if args.store:
+            source.close()
+    return ok
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Fiat-Shamir transcript: derive the verifier's challenges by hashing.
+
+Both parties feed the same messages into a transcript in the same order, and
+every challenge is a hash of everything absorbed so far. The prover can then
+produce the whole proof in one pass, and the verifier replays the transcript
+offline instead of sending a random challenge each round.
+
+    transcript = Transcript(b"chapter-07")
+    transcript.append_point(b"P", P)
+    # each round:
+    transcript.append_point(b"L", L)
+    transcript.append_point(b"R", R)
+    u = transcript.challenge_scalar(b"u")
+
+Points are absorbed in their compressed 32-byte encoding (bulletproofs.serialize),
+so the challenge does not depend on which Jacobian representation was used.
+Every message is length-prefixed and labeled, so different message
+sequences never hash the same.
+"""
+from bulletproofs.curve import curve_order as p
+from bulletproofs.serialize import encode_point, encode_points, encode_scalar
+from hashlib import sha256
+
+class Transcript:
+    """
+    Running hash of a protocol's messages.
+
+    Parameters:
+    - label: protocol name, which separates transcripts of different protocols
+    """
+    def __init__(self, label):
+        self._hash = sha256(b"bulletproofs transcript")
+        self.append_message(b"protocol", label)
+
+    def append_message(self, label, data):
+        label = label.encode('ascii') if isinstance(label, str) else label
+        data = data.encode('ascii') if isinstance(data, str) else data
+        self._hash.update(len(label).to_bytes(4, 'big') + label)
+        self._hash.update(len(data).to_bytes(4, 'big') + data)
+
+    def append_point(self, label, P):
+        self.append_message(label, encode_point(P))
+
+    def append_points(self, label, points):
+        self.append_message(label, encode_points(points))
+
+    def append_scalar(self, label, s):
+        self.append_message(label, encode_scalar(s))
+
+    def challenge_scalar(self, label):
+        """
+        Squeeze a nonzero challenge modulo the curve order.
+
+        64 bytes of hash output are reduced modulo p, which makes the bias
+        negligible. The challenge is absorbed back into the transcript, so two
+        challenges in a row are different.
+        """
+        self.append_message(b"challenge", label)
+        counter = 0
+        while True:
+            wide = b''.join(self._squeeze(counter + i) for i in range(2))
+            u = int.from_bytes(wide, 'big') % p
+            counter += 2
+            if u != 0:
+                break
+        self.append_scalar(b"challenge value", u)
+        return u
+
+    def _squeeze(self, counter):
+        h = self._hash.copy()
+        h.update(counter.to_bytes(4, 'big'))
+        return h.digest()
@@ -69,3 +69,10 @@ for idx, point in enumerate(vector_basis):
     # point[0] is FQ(x_candidate), point[1] is FQ(y_candidate)
     # Use .n to get the integer values of x and y
     print(f"Point {idx + 1}: x = {point[0].n}, y = {point[1].n}")
+
+# The loop above is a hash chain: point i can only be found after points 0 .. i-1.
+# bulletproofs.generators derives point i from (seed, i) alone, so any range of
+# points can be generated independently (and in parallel).
+from bulletproofs.generators import derive_generator
+point = derive_generator(seed, 9)
+print(f"derive_generator(seed, 9) (a different basis, not the hash chain's point 10): x = {point[0].n}, y = {point[1].n}")
@@ -1,6 +1,7 @@
-from py_ecc.bn128 import G1, multiply, add, FQ
-from py_ecc.bn128 import curve_order as p
+from bulletproofs.curve import G1, multiply, add, FQ, eq
+from bulletproofs.curve import curve_order as p
 import random
+from bulletproofs.fixed_base import precompute
 
 def random_field_element():
     return random.randint(0, p)
@@ -10,6 +11,9 @@ G = (FQ(628615531076633387179504297037256690608750211659025081213396745132063286
 
 B = (FQ(12848606535045587128788889317230751518392478691112375569775390095112330602489), FQ(18818936887558347291494629972517132071247847502517774285883500818572856935411))
 
+# Build fixed-base tables once so every multiply(G, ...) / multiply(B, ...) uses them
+precompute(G, B)
+
 # Scalar multiplication example: multiply(G, 42)
 # EC addition example: add(multiply(G, 42), multiply(G, 100))
 
@@ -38,7 +42,7 @@ def verify(C0, C1, C2, G, B, f_u, pi):
     RHS = add(multiply(G, f_u % p), multiply(B, pi % p))
 
     # Check if LHS equals RHS
-    return LHS == RHS
+    return eq(LHS, RHS)
 
 ## step 0: Prover and verifier agree on G and B
 # G and B are already defined above
@@ -71,3 +75,16 @@ if verify(C0, C1, C2, G, B, f_u, pi):
     print("accept")
 else:
     print("reject")
+
+# The same scheme works for any degree, and many openings of one commitment
+# can be checked together: bulletproofs.polycommit weights the k checks with
+# random r_j and adds them up, so the verifier does one MSM of size d + 3.
+from bulletproofs import polycommit
+coeffs = [random_field_element() for _ in range(8)]
+blindings = [random_field_element() for _ in range(8)]
+Cs = polycommit.commit(coeffs, blindings, G, B)
+points = [random_field_element() for _ in range(16)]
+openings = polycommit.open_many(coeffs, blindings, points)
+assert polycommit.verify_many(Cs, G, B, points, openings), "multi-point opening rejected"
+assert polycommit.verify([C0, C1, C2], G, B, u, f_u, pi), "degree 2 opening rejected"
+print("accept all %d openings of a degree %d polynomial" % (len(points), len(coeffs) - 1))
@@ -1,6 +1,7 @@
-from py_ecc.bn128 import G1, multiply, add, FQ, eq
-from py_ecc.bn128 import curve_order as p
+from bulletproofs.curve import G1, multiply, add, FQ, eq
+from bulletproofs.curve import curve_order as p
 import random
+from bulletproofs.fixed_base import precompute
 
 def random_element():
     return random.randint(0, p)
@@ -12,6 +13,9 @@ H = (FQ(137281624497210986156728444302611125380721663003110227968209296189594502
 
 B = (FQ(12848606535045587128788889317230751518392478691112375569775390095112330602489), FQ(18818936887558347291494629972517132071247847502517774285883500818572856935411))
 
+# Build fixed-base tables once so every multiply by G, H or B uses them
+precompute(G, H, B)
+
 # Utility function to add three elliptic curve points
 def addd(A, B, C):
     return add(A, add(B, C))
@@ -1,24 +1,22 @@
-from py_ecc.bn128 import G1, multiply, add, FQ, eq, Z1
-from py_ecc.bn128 import curve_order as p
-import numpy as np
-from functools import reduce
+from bulletproofs.curve import G1, multiply, add, FQ, eq
+from bulletproofs.curve import curve_order as p
 import random
+from bulletproofs.msm import msm
+from bulletproofs.fixed_base import precompute
+from bulletproofs import scalars
+from bulletproofs.transcript import Transcript
 
 def random_element():
     return random.randint(0, p)
 
-def add_points(*points):
-    # Add multiple elliptic curve points together
-    return reduce(add, points, Z1)
-
 # If points = G1, G2, G3, G4 and scalars = a,b,c,d vector_commit returns
 # aG1 + bG2 + cG3 + dG4
 def vector_commit(points, scalars):
-    return reduce(add, [multiply(P, i) for P, i in zip(points, scalars)], Z1)
+    return msm(points, scalars)
 
-# Custom inner product function using arbitrary-precision integers
+# Inner product of whole vectors, reduced modulo p once at the end
 def inner_product(a, b):
-    return sum((ai * bi) % p for ai, bi in zip(a, b)) % p
+    return scalars.inner_product(a, b)
 
 # These EC points have unknown discrete logs:
 G = [(FQ(6286155310766333871795042970372566906087502116590250812133967451320632869759), FQ(2167390362195738854837661032213065766665495464946848931705307210578191331138)),
@@ -33,29 +31,32 @@ H = [(FQ(13728162449721098615672844430261112538072166300311022796820929618959450
 
 B = (FQ(12848606535045587128788889317230751518392478691112375569775390095112330602489), FQ(18818936887558347291494629972517132071247847502517774285883500818572856935411))
 
+# Build fixed-base tables once for the commitment bases
+precompute(*G, *H, B)
+
 # scalar multiplication example: multiply(G, 42)
 # EC addition example: add(multiply(G, 42), multiply(G, 100))
 
 # Remember to do all arithmetic modulo p
 def commit(a, sL, b, sR, alpha, beta, gamma, tau_1, tau_2):
     # A = <a, G> + <b, H> + alpha * B
-    A = add_points(vector_commit(G, a), vector_commit(H, b), multiply(B, alpha % p))
+    A = vector_commit(G + H + [B], [*a, *b, alpha])
 
     # S = <sL, G> + <sR, H> + beta * B
-    S = add_points(vector_commit(G, sL), vector_commit(H, sR), multiply(B, beta % p))
+    S = vector_commit(G + H + [B], [*sL, *sR, beta])
 
     # V = v * G + gamma * B, where v = <a, b>
     v = inner_product(a, b) % p
     # Use G[0] as "G"
-    V = add(multiply(G[0], v % p), multiply(B, gamma % p))
+    V = vector_commit([G[0], B], [v, gamma])
 
     # T1 = (<a, sR> + <b, sL>) * G + tau_1 * B
     T1_coeff = (inner_product(a, sR) + inner_product(b, sL)) % p
-    T1 = add(multiply(G[0], T1_coeff), multiply(B, tau_1 % p))
+    T1 = vector_commit([G[0], B], [T1_coeff, tau_1])
 
     # T2 = <sL, sR> * G + tau_2 * B
     T2_coeff = inner_product(sL, sR) % p
-    T2 = add(multiply(G[0], T2_coeff), multiply(B, tau_2 %p))
+    T2 = vector_commit([G[0], B], [T2_coeff, tau_2])
 
     return (A, S, V, T1, T2)
 
@@ -71,13 +72,13 @@ def prove(blinding_0, blinding_1, blinding_2, u):
 
 ## step 1: Prover creates the commitments
 # Secret vector a
-a = np.array([89,15,90,22], dtype=object) % p
+a = [89, 15, 90, 22]
 # Secret vector b
-b = np.array([16,18,54,12], dtype=object) % p
+b = [16, 18, 54, 12]
 
 # Random vectors sL and sR
-sL = np.array([random_element() for _ in range(4)], dtype=object)
-sR = np.array([random_element() for _ in range(4)], dtype=object)
+sL = [random_element() for _ in range(4)]
+sR = [random_element() for _ in range(4)]
 
 # Compute t1 and t2 coefficients
 t1 = (inner_product(a, sR) + inner_product(b, sL)) % p
@@ -93,13 +94,17 @@ tau_2 = random_element()
 A, S, V, T1, T2 = commit(a, sL, b, sR, alpha, beta, gamma, tau_1, tau_2)
 
 ## step 2: Verifier picks u
-u = random_element()
+# Non-interactively: u is a hash of the commitments (Fiat-Shamir). The verifier
+# replays the same transcript to get the same u, so no round trip is needed.
+transcript = Transcript(b"chapter-05")
+transcript.append_points(b"A, S, V, T1, T2", [A, S, V, T1, T2])
+u = transcript.challenge_scalar(b"u")
 
 ## step 3: Prover evaluates l(u), r(u), t(u) and creates evaluation proofs
-# l(u) = a + sL * u
-l_u = evaluate(a, sL, 0, u)
+# l(u) = a + sL * u, evaluated on the whole vectors at once
+l_u = scalars.evaluate([a, sL], u)
 # r(u) = b + sR * u
-r_u = evaluate(b, sR, 0, u)
+r_u = scalars.evaluate([b, sR], u)
 # t(u) = v + t1 * u + t2 * u^2
 t_u = evaluate(inner_product(a,b), t1, t2, u)
 
@@ -109,28 +114,28 @@ pi_t = prove(gamma, tau_1, tau_2, u)
 ## step 4: Verifier accepts or rejects
 
 # First, check that t_u == <l_u, r_u> mod p
-assert t_u == inner_product(np.array(l_u), np.array(r_u)), "tu !=〈lu, ru〉"
+assert t_u == inner_product(l_u, r_u), "tu !=〈lu, ru〉"
 
 # Second, check A + S * u == <l_u, G> + <r_u, H> + pi_lr * B
-left_side = add(A, multiply(S, u % p))
-right_side = add_points(
-    vector_commit(G, l_u),
-    vector_commit(H, r_u),
-    multiply(B, pi_lr % p)
-)
+left_side = vector_commit([A, S], [1, u])
+right_side = vector_commit(G + H + [B], [*l_u, *r_u, pi_lr])
 assert eq(left_side, right_side), "l_u or r_u not evaluated correctly"
 
 # Third, check t_u * G + pi_t * B == V + T1 * u + T2 * u^2
-left_side_t = add(
-    # Use G[0] as "G"
-    multiply(G[0], t_u % p),
-    multiply(B, pi_t % p)
-)
-right_side_t = add_points(
-    V,
-    multiply(T1, u % p),
-    multiply(T2, pow(u, 2, p))
-)
+# Use G[0] as "G"
+left_side_t = vector_commit([G[0], B], [t_u, pi_t])
+right_side_t = vector_commit([V, T1, T2], [1, u, pow(u, 2, p)])
 assert eq(left_side_t, right_side_t), "t_u not evaluated correctly"
 
 print("Proof accepted. Inner product verified.")
+
+# If only a few entries of a or b change, the commitments do not have to be
+# recomputed: A moves by (new - old) * G_i, and V and T1 by the matching change
+# of v and t1. bulletproofs.commitment keeps A, S, V, T1, T2 up to date this way.
+from bulletproofs.commitment import InnerProductCommitments
+state = InnerProductCommitments(G, H, B, G[0], a, b, sL, sR, alpha, beta, gamma, tau_1, tau_2)
+state.update_a({1: 16})
+state.update_b({3: 13})
+recommitted = commit([89, 16, 90, 22], sL, [16, 18, 54, 13], sR, alpha, beta, gamma, tau_1, tau_2)
+assert all(eq(X, Y) for X, Y in zip(state.commitments(), recommitted)), "incremental update does not match"
+print("Incremental update matches a full recommit.")
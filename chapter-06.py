@@ -1,14 +1,20 @@
-from py_ecc.bn128 import G1, multiply, add, FQ, eq, Z1
-from py_ecc.bn128 import curve_order as p
+from bulletproofs.curve import G1, multiply, add, FQ, eq, Z1
+from bulletproofs.curve import curve_order as p
 import random
 from functools import reduce
+from bulletproofs.msm import msm
+from bulletproofs.fixed_base import precompute
+from bulletproofs import scalars
+from bulletproofs import field
 
 def random_element():
     return random.randint(0, p)
 
 def modinv(a, p):
-    # Compute the modular inverse using Fermat's Little Theorem
-    return pow(a, p - 2, p)
+    # Compute the modular inverse with the extended Euclidean algorithm, which is
+    # much cheaper than the exponentiation a^(p-2) from Fermat's Little Theorem
+    # (gmpy2's, if the field backend uses it)
+    return int(field.inverse(a, p))
 
 def add_points(*points):
     # Add multiple elliptic curve points together
@@ -16,7 +22,7 @@ def add_points(*points):
 
 # Vector commitment function
 def vector_commit(points, scalars):
-    return reduce(add, [multiply(P, int(s % p)) for P, s in zip(points, scalars)], Z1)
+    return msm(points, [int(s % p) for s in scalars])
 
 # EC points with unknown discrete logs
 G_vec = [
@@ -30,17 +36,13 @@ G_vec = [
      FQ(3439606165356845334365677247963536173939840949797525638557303009070611741415))
 ]
 
+# Build fixed-base tables once for the commitment bases
+precompute(*G_vec)
+
 # Fold scalar vector
 def fold(scalar_vec, u, u_inv):
-    n = len(scalar_vec)
-    assert n % 2 == 0, "Length of scalar_vec must be even"
-    folded = []
-    for i in range(n // 2):
-        idx1 = 2 * i
-        idx2 = 2 * i + 1
-        term = (scalar_vec[idx1] * u + scalar_vec[idx2] * u_inv) % p
-        folded.append(term)
-    return folded
+    # folded[i] = scalar_vec[2i] * u + scalar_vec[2i+1] * u_inv, computed on the whole vector
+    return scalars.fold(scalar_vec, u, u_inv)
 
 # Fold point vector
 def fold_points(point_vec, u_inv, u):
@@ -93,7 +95,7 @@ aprime = fold(a, u, u_inv)
 Gprime = fold_points(G_vec, u_inv, u)  # Note the order of u_inv and u
 
 # Verification check
-left_side = add_points(multiply(L, u2 % p), A, multiply(R, u_inv2 % p))
+left_side = vector_commit([L, A, R], [u2, 1, u_inv2])
 right_side = vector_commit(Gprime, aprime)
 
 assert eq(left_side, right_side), "Invalid proof"
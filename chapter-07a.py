@@ -1,9 +1,14 @@
-# Import necessary modules and functions from the py_ecc library
-from py_ecc.bn128 import G1, multiply, add, FQ, eq, Z1
-from py_ecc.bn128 import curve_order as p
+# Import curve arithmetic (Jacobian coordinates, same interface as py_ecc.bn128)
+from bulletproofs.curve import G1, multiply, add, FQ, eq, Z1
+from bulletproofs.curve import curve_order as p
 import numpy as np
 from functools import reduce
 import random
+from bulletproofs.msm import msm
+from bulletproofs.fixed_base import precompute
+from bulletproofs.ipa import verify as verify_single_msm
+from bulletproofs import scalars
+from bulletproofs.transcript import Transcript
 
 def random_element():
     return random.randint(0, p)
@@ -26,7 +31,7 @@ def vector_commit(points, scalars):
     Returns:
     - commitment: an elliptic curve point representing the commitment
     """
-    return reduce(add, [multiply(P, i) for P, i in zip(points, scalars)], Z1)
+    return msm(points, scalars)
 
 # These elliptic curve points have unknown discrete logarithms:
 G_vec = [
@@ -48,50 +53,53 @@ G_vec = [
     )
 ]
 
-def fold(scalar_vec, u):
+# Build fixed-base tables once for the commitment bases
+precompute(*G_vec)
+
+def fold(scalar_vec, u, u_inv=None):
     """
     Fold a scalar vector using a challenge scalar u.
 
     Parameters:
     - scalar_vec: list of scalars (integers modulo p)
     - u: challenge scalar
+    - u_inv: modular inverse of u, if already known
 
     Returns:
     - folded_vec: folded list of scalars
     """
-    n = len(scalar_vec)
-    assert n % 2 == 0, "Length of scalar_vec must be even to fold"  # If not, pad with zeros
-    folded_vec = []
-    u_inv = pow(u, -1, p)  # Compute modular inverse of u modulo p
-    for i in range(0, n, 2):
-        # Fold the scalars using the formula:
-        # folded_element = scalar_vec[i] * u + scalar_vec[i+1] * u_inv (mod p)
-        folded_ele = scalar_vec[i] * u + scalar_vec[i + 1] * u_inv
-        folded_vec.append(folded_ele % p)
-    return folded_vec
+    # Fold the whole vector at once using the formula:
+    # folded_element = scalar_vec[i] * u + scalar_vec[i+1] * u_inv (mod p)
+    # (if the length is odd, the last element is carried over unchanged)
+    return scalars.fold(scalar_vec, u, u_inv)
 
-def fold_points(point_vec, u):
+def fold_points(point_vec, u, u_inv=None):
     """
     Fold a point vector using a challenge scalar u.
 
     Parameters:
     - point_vec: list of elliptic curve points
     - u: challenge scalar
+    - u_inv: modular inverse of u, if already known
 
     Returns:
     - folded_vec: folded list of points
     """
     n = len(point_vec)
-    assert n % 2 == 0, "Length of point_vec must be even to fold"  # If not, pad with identity points
     folded_vec = []
-    u_inv = pow(u, -1, p)  # Compute modular inverse of u modulo p
-    for i in range(0, n, 2):
+    if u_inv is None:
+        u_inv = pow(u, -1, p)  # Compute modular inverse of u modulo p
+    for i in range(0, n - 1, 2):
         # Fold the points using the formula:
         # folded_point = point_vec[i] * u + point_vec[i+1] * u_inv
         P1 = multiply(point_vec[i], u)
         P2 = multiply(point_vec[i + 1], u_inv)
         folded_ele = add(P1, P2)
         folded_vec.append(folded_ele)
+    if n % 2 == 1:
+        # The last point has no partner: carry it to the next round unchanged
+        # (no padding needed, the matching scalar is carried the same way)
+        folded_vec.append(point_vec[-1])
     return folded_vec
 
 def compute_secondary_diagonal(G_vec, a):
@@ -107,24 +115,14 @@ def compute_secondary_diagonal(G_vec, a):
     """
     assert len(G_vec) == len(a), "Unequal length of G_vec and a"
     n = len(a)
-    if n == 4:
-        # For n = 4, compute L and R as per the specified indices
-        # L = a1 * G2 + a3 * G4
-        # R = a2 * G1 + a4 * G3
-        L = add(
-            multiply(G_vec[1], a[0]),
-            multiply(G_vec[3], a[2])
-        )
-        R = add(
-            multiply(G_vec[0], a[1]),
-            multiply(G_vec[2], a[3])
-        )
-    else:
-        # For n = 2, compute L and R accordingly
-        # L = a1 * G2
-        # R = a2 * G1
-        L = multiply(G_vec[1], a[0])
-        R = multiply(G_vec[0], a[1])
+    # Pair up (a1, a2), (a3, a4), ... with (G1, G2), (G3, G4), ...:
+    # L = a1 * G2 + a3 * G4 + ...
+    # R = a2 * G1 + a4 * G3 + ...
+    # For odd n the last element has no partner and is left out; fold and
+    # fold_points carry it into the next round
+    m = n - n % 2
+    L = vector_commit(G_vec[1:m:2], a[0:m:2])
+    R = vector_commit(G_vec[0:m:2], a[1:m:2])
     return (L, R)
 
 # Secret scalar vector a
@@ -133,17 +131,27 @@ a = [4, 2, 42, 420]  # Example scalars
 # Compute the initial commitment P = sum_i (a_i * G_i)
 P = vector_commit(G_vec, a)
 
+# Challenges come from a Fiat-Shamir transcript of everything sent so far, so the
+# prover can compute the whole proof in one pass and the verifier can check it
+# offline by replaying the same transcript
+transcript = Transcript(b"chapter-07a")
+transcript.append_point(b"P", P)
+
 # First folding step
 L1, R1 = compute_secondary_diagonal(G_vec, a)
-u1 = random_element()  # Prover receives a challenge u1 from the verifier
-aprime = fold(a, u1)
-Gprime = fold_points(G_vec, pow(u1, -1, p))
+transcript.append_points(b"L1, R1", [L1, R1])
+u1 = transcript.challenge_scalar(b"u1")  # Instead of receiving u1 from the verifier
+u1_inv = pow(u1, -1, p)  # Compute the inverse once and use it for both folds
+aprime = fold(a, u1, u1_inv)
+Gprime = fold_points(G_vec, u1_inv, u1)
 
 # Second folding step
 L2, R2 = compute_secondary_diagonal(Gprime, aprime)
-u2 = random_element()  # Prover receives a challenge u2 from the verifier
-aprimeprime = fold(aprime, u2)
-Gprimeprime = fold_points(Gprime, pow(u2, -1, p))
+transcript.append_points(b"L2, R2", [L2, R2])
+u2 = transcript.challenge_scalar(b"u2")
+u2_inv = pow(u2, -1, p)
+aprimeprime = fold(aprime, u2, u2_inv)
+Gprimeprime = fold_points(Gprime, u2_inv, u2)
 
 # Ensure that the vectors have been folded down to length 1
 assert len(Gprimeprime) == 1 and len(aprimeprime) == 1, "Final vector must be of length 1"
@@ -152,14 +160,20 @@ assert len(Gprimeprime) == 1 and len(aprimeprime) == 1, "Final vector must be of
 # Reconstruct the commitment using the folded scalars and points, and the L and R commitments
 # The verification equation is:
 # vector_commit(G'', a'') == L2 * u2^2 + L1 * u1^2 + P + R1 * u1^-2 + R2 * u2^-2
+# The verifier inverts all challenges at once with a single modular inversion
+v1_inv, v2_inv = scalars.batch_inverse([u1, u2])
 left_side = vector_commit(Gprimeprime, aprimeprime)
-right_side = add_points(
-    multiply(L2, pow(u2, 2, p)),
-    multiply(L1, pow(u1, 2, p)),
-    P,
-    multiply(R1, pow(u1, -2, p)),
-    multiply(R2, pow(u2, -2, p))
+right_side = vector_commit(
+    [L2, L1, P, R1, R2],
+    [u2 * u2 % p, u1 * u1 % p, 1, v1_inv * v1_inv % p, v2_inv * v2_inv % p]
 )
 assert eq(left_side, right_side), "Invalid proof"
 
+# The verifier does not actually need G'' round by round. With the challenges alone
+# it computes s_i = product over rounds j of u_j^-1 or u_j (chosen by bit j of i),
+# so that G'' = <s, G>, and checks the whole equation
+# <a'' s, G> == L1 * u1^2 + L2 * u2^2 + P + R1 * u1^-2 + R2 * u2^-2
+# as a single multi-scalar multiplication of size n + 2 log n + 1
+assert verify_single_msm(G_vec, P, [L1, L2], [R1, R2], [u1, u2], aprimeprime[0]), "Invalid proof"
+
 print("Proof accepted. Opening verified with proof size log n.")
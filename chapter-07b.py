@@ -1,8 +1,10 @@
-from py_ecc.bn128 import G1, multiply, add, FQ, eq, Z1
-from py_ecc.bn128 import curve_order as p
+from bulletproofs.curve import G1, multiply, add, FQ, eq, Z1
+from bulletproofs.curve import curve_order as p
 import numpy as np
 from functools import reduce
 import random
+from bulletproofs.msm import msm
+from bulletproofs.fixed_base import precompute
 
 def random_element():
     return random.randint(0, p)
@@ -13,7 +15,7 @@ def add_points(*points):
 # if points = G1, G2, G3, G4 and scalars = a,b,c,d vector_commit returns
 # aG1 + bG2 + cG3 + dG4
 def vector_commit(points, scalars):
-    return reduce(add, [multiply(P, i) for P, i in zip(points, scalars)], Z1)
+    return msm(points, scalars)
 
 # these EC points have unknown discrete logs:
 G_vec = [(FQ(6286155310766333871795042970372566906087502116590250812133967451320632869759), FQ(2167390362195738854837661032213065766665495464946848931705307210578191331138)),
@@ -28,6 +30,9 @@ H = [(FQ(13728162449721098615672844430261112538072166300311022796820929618959450
 
 Q = (FQ(11573005146564785208103371178835230411907837176583832948426162169859927052980), FQ(895714868375763218941449355207566659176623507506487912740163487331762446439))
 
+# Build fixed-base tables once for the commitment bases
+precompute(*G_vec, *H, Q)
+
 
 # return a folded vector of length n/2 for scalars
 def fold(scalar_vec, u):